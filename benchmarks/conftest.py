@@ -0,0 +1,30 @@
+from __future__ import annotations
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+import pytest
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--benchmark-output",
+        default="benchmark-results.json",
+        help="Where to write kookit benchmark results (JSON)",
+    )
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request: pytest.FixtureRequest) -> Iterable[dict]:
+    results: dict = {}
+    yield results
+
+    report: dict[str, Any] = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    with Path(request.config.getoption("benchmark_output")).open("w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
@@ -0,0 +1,42 @@
+import time
+import tracemalloc
+from pathlib import Path
+
+from kookit import Cassette
+
+
+INTERACTIONS = 100000
+LOOKUPS = 10000
+
+
+def test_cassette_replay(benchmark_results: dict, tmp_path: Path) -> None:
+    cassette = Cassette(tmp_path / "large.kkc")
+    cassette.record("http://upstream")
+    content: bytes = b'{"items": []}' * 10
+    for index in range(INTERACTIONS):
+        cassette.append(b"GET", f"/items/{index}".encode(), b"", 200, b"", content)
+
+    started_at: float = time.perf_counter()
+    cassette.seal()
+    sealing: float = time.perf_counter() - started_at
+
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    player = cassette.replay().routes[0].app  # type: ignore[attr-defined]
+    opening: float = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started_at = time.perf_counter()
+    for index in range(LOOKUPS):
+        player.play(b"GET", f"/items/{index * 7}".encode(), b"")
+    playing: float = time.perf_counter() - started_at
+
+    benchmark_results["cassette"] = {
+        "interactions": INTERACTIONS,
+        "file_kib": cassette.path.stat().st_size / 1024,
+        "seal_ms": sealing * 1000,
+        "open_ms": opening * 1000,
+        "open_peak_kib": peak / 1024,
+        "us_per_play": playing / LOOKUPS * 1e6,
+    }
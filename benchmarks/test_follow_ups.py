@@ -0,0 +1,39 @@
+import time
+from typing import Any
+
+import pytest
+
+from kookit import Kookit, KookitJSONRequest, KookitJSONResponse
+
+
+@pytest.mark.parametrize("fan_out", [1, 10, 100])
+def test_follow_up_fan_out(mocker: Any, benchmark_results: dict, fan_out: int) -> None:
+    kookit = Kookit(mocker)
+    callee: Any = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url=f"/callback/{i}", method="POST") for i in range(fan_out)
+        ],
+    )
+    caller = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url="/trigger"),
+            *(
+                KookitJSONRequest(callee, url=f"/callback/{i}", method="POST", json={})
+                for i in range(fan_out)
+            ),
+        ],
+    )
+
+    with kookit:
+        started_at: float = time.perf_counter()
+        kookit.get(caller, "/trigger")
+        # consumed groups are visible from the test process right away
+        while any(group.active for group in callee.response_groups):
+            time.sleep(0.0005)
+        elapsed: float = time.perf_counter() - started_at
+    kookit.close()
+
+    benchmark_results[f"follow_ups[{fan_out}]"] = {
+        "elapsed_ms": elapsed * 1000,
+        "per_request_ms": elapsed * 1000 / fan_out,
+    }
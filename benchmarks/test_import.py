@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+
+def import_time_us(module: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import pytest, {module}"],  # noqa: S603
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # lines are of the form: "import time: <self us> | <cumulative us> | <module>"
+    for line in result.stderr.splitlines():
+        _, _, cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        if name == module:
+            return int(cumulative)
+    msg = f"no import time for {module}"
+    raise RuntimeError(msg)
+
+
+def test_import(benchmark_results: dict) -> None:
+    benchmark_results["import"] = {
+        "plugin_ms": import_time_us("kookit") / 1000,
+        "full_ms": import_time_us("kookit.kookit") / 1000,
+    }
@@ -0,0 +1,33 @@
+import time
+
+from kookit.http_kookit.journal import RequestJournal
+
+
+CALLS = 100000
+
+
+def test_journal(benchmark_results: dict) -> None:
+    journal = RequestJournal()
+    scope: dict = {
+        "method": "POST",
+        "path": "/journal",
+        "query_string": b"page=1",
+        "headers": [(f"header-{index}".encode(), b"value") for index in range(10)],
+    }
+
+    started_at: float = time.perf_counter()
+    for index in range(CALLS):
+        journal.append(scope, b"body", 4, ("POST", "/journal"), received_at=index, duration=0.0)
+    appending: float = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    calls: int = len(journal.calls("POST", "/journal"))
+    reading: float = time.perf_counter() - started_at
+    journal.close()
+
+    benchmark_results["journal"] = {
+        "us_per_append": appending / CALLS * 1e6,
+        "calls_kept": calls,
+        "read_ms": reading * 1000,
+        "memory_kib": journal.shard_size / 1024,
+    }
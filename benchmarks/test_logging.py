@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+from kookit.logging import KookitLogger
+
+
+RECORDS = 10000
+
+
+@pytest.mark.parametrize("mode", ["gated", "buffered", "emitted"])
+def test_logging(benchmark_results: dict, mode: str, capsys: pytest.CaptureFixture) -> None:
+    logger = KookitLogger(
+        "TRACE" if mode == "emitted" else "DEBUG", buffer=RECORDS if mode == "buffered" else 0
+    )
+    headers: dict = {f"header-{index}": "value" for index in range(10)}
+
+    started_at: float = time.perf_counter()
+    for index in range(RECORDS):
+        logger.trace("{}: expected headers: {}, got: {}", index, headers, headers)
+    elapsed: float = time.perf_counter() - started_at
+    capsys.readouterr()
+
+    benchmark_results[f"logging[{mode}]"] = {"us_per_record": elapsed / RECORDS * 1e6}
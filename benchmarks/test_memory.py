@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from kookit import Kookit, KookitJSONResponse
+
+
+SERVICES = 100
+RESPONSES = 10
+
+
+def rss_kib(pid: int, field: str = "VmRSS", path: str = "status") -> int:
+    for line in Path(f"/proc/{pid}/{path}").read_text().splitlines():
+        if line.startswith(f"{field}:"):
+            return int(line.split()[1])
+    msg = f"no {field} for process {pid}"
+    raise RuntimeError(msg)
+
+
+def pss_kib(pid: int) -> int:
+    # pages shared copy-on-write are split between the processes sharing them
+    return rss_kib(pid, "Pss", "smaps_rollup")
+
+
+def server_rss_kib(
+    mocker: Any, services: int, start_method: str = "fork", measure: Any = rss_kib
+) -> int:
+    kookit = Kookit(mocker, start_method=start_method)
+    for service in range(services):
+        kookit.new_http_service(
+            actions=[
+                KookitJSONResponse({"service": service}, url=f"/{service}/{index}")
+                for index in range(RESPONSES)
+            ],
+            name=f"service{service}",
+        )
+
+    with kookit(shutdown_timeout=0.5):
+        rss: int = measure(kookit.http_kookit.process_manager.process.pid)  # type: ignore[union-attr]
+        for group in (g for s in kookit.http_kookit.services for g in s.response_groups):
+            group.deactivate()
+    kookit.close()
+    return rss
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="procfs is required")
+def test_memory_per_service(mocker: Any, benchmark_results: dict) -> None:
+    baseline: int = server_rss_kib(mocker, 1)
+    loaded: int = server_rss_kib(mocker, SERVICES + 1)
+
+    benchmark_results["memory"] = {
+        "server_rss_kib": baseline,
+        "per_service_kib": (loaded - baseline) / SERVICES,
+        "responses_per_service": RESPONSES,
+    }
+
+
+@pytest.mark.skipif(not Path("/proc/self/smaps_rollup").exists(), reason="procfs is required")
+@pytest.mark.parametrize("start_method", ["fork", "forkserver"])
+def test_memory_per_server(mocker: Any, benchmark_results: dict, start_method: str) -> None:
+    # forkserver servers are forked from the zygote
+    benchmark_results[f"memory[{start_method}]"] = {
+        "server_pss_kib": server_rss_kib(mocker, 1, start_method, pss_kib),
+    }
@@ -0,0 +1,49 @@
+import time
+from typing import Any
+
+import pytest
+from multiprocess.reduction import ForkingPickler
+
+from kookit import Kookit, KookitJSONResponse
+from kookit.http_kookit.service import KookitHTTPService
+from .utils import summarize
+
+
+ROUNDS = 20
+
+
+@pytest.mark.parametrize("actions", [10, 1000])
+def test_serialization(mocker: Any, benchmark_results: dict, actions: int) -> None:
+    # what a spawned server process gets of a service
+    service = (kookit := Kookit(mocker)).new_http_service(
+        actions=[KookitJSONResponse({"index": index}, url=f"/{index}") for index in range(actions)]
+    )
+
+    durations: list = []
+    for _ in range(ROUNDS):
+        started_at: float = time.perf_counter()
+        payload: bytes = bytes(ForkingPickler.dumps(service.spec()))  # type: ignore[attr-defined]
+        durations.append(time.perf_counter() - started_at)
+
+    service.reset_actions()
+    kookit.close()
+    benchmark_results[f"serialization[{actions}]"] = {
+        "bytes": len(payload),
+        **summarize(durations),
+    }
+
+
+@pytest.mark.parametrize("actions", [10, 1000])
+def test_groups_allocation(benchmark_results: dict, actions: int) -> None:
+    responses: list = [KookitJSONResponse({}, url=f"/{index}") for index in range(actions)]
+
+    durations: list = []
+    for _ in range(ROUNDS):
+        started_at: float = time.perf_counter()
+        groups = KookitHTTPService.create_response_groups(responses)
+        durations.append(time.perf_counter() - started_at)
+
+    benchmark_results[f"groups_allocation[{actions}]"] = {
+        "shared_blocks": len(groups[0].states.blocks),
+        **summarize(durations),
+    }
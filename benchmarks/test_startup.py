@@ -0,0 +1,50 @@
+import time
+from typing import Any, Iterable
+
+import pytest
+
+from kookit import Kookit, KookitJSONResponse
+from kookit.http_kookit import KookitHTTPServerPool
+from .utils import summarize
+
+
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def pool() -> Iterable[KookitHTTPServerPool]:
+    pool = KookitHTTPServerPool()
+    yield pool
+    pool.close()
+
+
+def new_kookit(mocker: Any, pool: KookitHTTPServerPool, mode: str) -> Kookit:
+    return Kookit(
+        mocker,
+        pool if mode == "warm" else None,
+        in_process=mode == "in_process",
+        start_method="forkserver" if mode == "zygote" else None,
+    )
+
+
+def startup(kookit: Kookit) -> float:
+    service = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/ping")])
+
+    started_at: float = time.perf_counter()
+    with kookit:
+        duration: float = time.perf_counter() - started_at
+        kookit.get(service, "/ping")
+    kookit.close()
+    return duration
+
+
+@pytest.mark.parametrize("mode", ["cold", "warm", "in_process", "zygote"])
+def test_startup(
+    mocker: Any, pool: KookitHTTPServerPool, benchmark_results: dict, mode: str
+) -> None:
+    if mode in ("warm", "zygote"):
+        # the first round only warms the pool or the zygote up
+        startup(new_kookit(mocker, pool, mode))
+
+    durations: list = [startup(new_kookit(mocker, pool, mode)) for _ in range(ROUNDS)]
+    benchmark_results[f"startup[{mode}]"] = summarize(durations)
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import APIRouter
+
+from kookit import Kookit, KookitJSONResponse
+from .utils import summarize
+
+
+REQUESTS = 1000
+CONCURRENCY = 32
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+@pytest.mark.parametrize("routes", [1, 100, 1000])
+def test_throughput(mocker: Any, benchmark_results: dict, routes: int, in_process: bool) -> None:
+    # every response is consumed once, so the script is repeated over the routes
+    service = (kookit := Kookit(mocker, in_process=in_process)).new_http_service(
+        actions=[
+            KookitJSONResponse({"index": index}, url=f"/route/{index % routes}")
+            for index in range(REQUESTS)
+        ]
+    )
+
+    latencies: list = []
+    with kookit:
+        started_at: float = time.perf_counter()
+        for index in range(REQUESTS):
+            request_started_at: float = time.perf_counter()
+            response = kookit.get(service, f"/route/{index % routes}")
+            latencies.append(time.perf_counter() - request_started_at)
+            assert response.status_code == 200
+        elapsed: float = time.perf_counter() - started_at
+    kookit.close()
+
+    mode: str = "in_process" if in_process else "server"
+    benchmark_results[f"throughput[{mode}-{routes}]"] = {
+        "rps": REQUESTS / elapsed,
+        **summarize(latencies),
+    }
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_concurrent_throughput(mocker: Any, benchmark_results: dict, workers: int) -> None:
+    router = APIRouter()
+
+    @router.get("/route")
+    def route() -> dict:
+        return {"workers": workers}
+
+    service = (kookit := Kookit(mocker)).new_http_service(routers=[router], workers=workers)
+
+    async def load(client: httpx.AsyncClient, latencies: list) -> None:
+        for _ in range(REQUESTS // CONCURRENCY):
+            request_started_at: float = time.perf_counter()
+            response = await client.get("/route")
+            latencies.append(time.perf_counter() - request_started_at)
+            assert response.status_code == 200
+
+    async def run() -> list:
+        latencies: list = []
+        # a connection per client, so that connections are spread over the workers
+        clients = [httpx.AsyncClient(base_url=service.url) for _ in range(CONCURRENCY)]
+        await asyncio.gather(*(load(client, latencies) for client in clients))
+        await asyncio.gather(*(client.aclose() for client in clients))
+        return latencies
+
+    with kookit:
+        started_at: float = time.perf_counter()
+        latencies: list = asyncio.run(run())
+        elapsed: float = time.perf_counter() - started_at
+    kookit.close()
+
+    benchmark_results[f"concurrent_throughput[workers-{workers}]"] = {
+        "rps": len(latencies) / elapsed,
+        **summarize(latencies),
+    }
@@ -0,0 +1,19 @@
+from statistics import mean
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples: Sequence[float]) -> dict:
+    """Summarize durations (seconds) in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": mean(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
@@ -1,2 +1,42 @@
-from .http_kookit import *
-from .kookit import *
+from __future__ import annotations
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .plugin import *
+
+
+if TYPE_CHECKING:
+    from .http_kookit import *
+    from .kookit import *
+
+
+# public names are imported on first use, so that the plugin costs nothing until then
+LAZY_NAMES: dict[str, str] = {
+    "IKookitHTTPService": ".kookit",
+    "Kookit": ".kookit",
+    "Cassette": ".http_kookit",
+    "Faults": ".http_kookit",
+    "HTTPKookit": ".http_kookit",
+    "KookitASGIServer": ".http_kookit",
+    "KookitASGITransport": ".http_kookit",
+    "KookitFileResponse": ".http_kookit",
+    "KookitHTTPRequest": ".http_kookit",
+    "KookitHTTPResponse": ".http_kookit",
+    "KookitHTTPServerPool": ".http_kookit",
+    "KookitJSONRequest": ".http_kookit",
+    "KookitJSONResponse": ".http_kookit",
+    "KookitStreamingResponse": ".http_kookit",
+    "KookitXMLResponse": ".http_kookit",
+    "LogNormalLatency": ".http_kookit",
+    "NormalLatency": ".http_kookit",
+    "PercentileLatency": ".http_kookit",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in LAZY_NAMES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value: Any = getattr(import_module(LAZY_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
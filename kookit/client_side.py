@@ -1,6 +1,7 @@
-from typing import Any, Protocol
+from __future__ import annotations
+from typing import Any, Final, Protocol
 
-from httpx import Client, Response
+from httpx import AsyncClient, Client, Response
 
 
 class IKookitService(Protocol):
@@ -9,9 +10,22 @@ class IKookitService(Protocol):
 
 
 class KookitHTTPClient:
+    def __init__(self) -> None:
+        self.clients: Final[dict[str, Client]] = {}
+        super().__init__()
+
+    def client(self, service: IKookitService) -> Client:
+        if service.url not in self.clients:
+            self.clients[service.url] = Client(base_url=service.url)
+        return self.clients[service.url]
+
+    def close_clients(self) -> None:
+        for client in self.clients.values():
+            client.close()
+        self.clients.clear()
+
     def request(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
-        with Client(base_url=service.url) as client:
-            return client.request(*args, **kwargs)
+        return self.client(service).request(*args, **kwargs)
 
     def get(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
         return self.request(service, "GET", *args, **kwargs)
@@ -33,3 +47,43 @@ class KookitHTTPClient:
 
     def head(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
         return self.request(service, "HEAD", *args, **kwargs)
+
+
+class KookitAsyncHTTPClient:
+    def __init__(self) -> None:
+        self.async_clients: Final[dict[str, AsyncClient]] = {}
+        super().__init__()
+
+    def async_client(self, service: IKookitService) -> AsyncClient:
+        if service.url not in self.async_clients:
+            self.async_clients[service.url] = AsyncClient(base_url=service.url)
+        return self.async_clients[service.url]
+
+    async def aclose_clients(self) -> None:
+        for client in self.async_clients.values():
+            await client.aclose()
+        self.async_clients.clear()
+
+    async def arequest(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.async_client(service).request(*args, **kwargs)
+
+    async def aget(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "GET", *args, **kwargs)
+
+    async def apost(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "POST", *args, **kwargs)
+
+    async def aput(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "PUT", *args, **kwargs)
+
+    async def adelete(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "DELETE", *args, **kwargs)
+
+    async def aoptions(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "OPTIONS", *args, **kwargs)
+
+    async def apatch(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "PATCH", *args, **kwargs)
+
+    async def ahead(self, service: IKookitService, *args: Any, **kwargs: Any) -> Response:
+        return await self.arequest(service, "HEAD", *args, **kwargs)
@@ -1,2 +1,6 @@
+from .asgi import *
+from .cassette import *
+from .faults import *
 from .kookit import *
 from .models import *
+from .pool import *
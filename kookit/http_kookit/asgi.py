@@ -0,0 +1,197 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable, Final, Sequence
+
+from fastapi import FastAPI
+from fastapi.middleware import Middleware
+from httpx import (
+    ASGITransport,
+    AsyncBaseTransport,
+    AsyncHTTPTransport,
+    BaseTransport,
+    HTTPTransport,
+    RemoteProtocolError,
+    Request,
+    Response,
+)
+from multiprocess.util import Finalize
+from typing_extensions import Self
+
+from kookit.logging import logger
+from kookit.utils import bind_port
+from .faults import InjectedFault
+from .journal import JournalMiddleware
+from .server import ServicesLoader
+
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+    from types import TracebackType
+
+    from httpx import URL
+    from pytest_mock import MockerFixture
+
+    from .interfaces import IService
+
+
+__all__ = ["KookitASGIServer", "KookitASGITransport"]
+
+
+class KookitASGITransport(BaseTransport, AsyncBaseTransport):
+    def __init__(self, app: FastAPI, loop: asyncio.AbstractEventLoop) -> None:
+        self.transport: Final = ASGITransport(app=app)
+        self.loop: Final = loop
+
+    def handle_request(self, request: Request) -> Response:
+        request.read()
+        return asyncio.run_coroutine_threadsafe(self.send(request), self.loop).result()
+
+    async def handle_async_request(self, request: Request) -> Response:
+        await request.aread()
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self.send(request), self.loop),
+        )
+
+    async def send(self, request: Request) -> Response:
+        try:
+            response = await self.transport.handle_async_request(request)
+        except InjectedFault as exc:
+            # what clients get of a connection dropped by a server
+            raise RemoteProtocolError(str(exc), request=request) from exc
+        return Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            content=await response.aread(),
+            extensions=response.extensions,
+            request=request,
+        )
+
+
+class ASGIServing:
+    def __init__(
+        self,
+        server: KookitASGIServer,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> None:
+        self.server: Final = server
+        self.services: Final = services
+        self.startup_timeout: Final = startup_timeout
+        self.shutdown_timeout: Final = shutdown_timeout
+        self.parent: Final = parent
+        self.loop: Final = asyncio.new_event_loop()
+        self.thread: Final = Thread(target=self.loop.run_forever, daemon=True)
+        self.loader: Final = ServicesLoader(FastAPI(middleware=[Middleware(JournalMiddleware)]))
+
+    def __repr__(self) -> str:
+        return self.parent
+
+    def call(self, coro: Coroutine, timeout: float) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def __enter__(self) -> Self:
+        self.thread.start()
+        logger.trace("{}: loading services ({} seconds)", self, self.startup_timeout)
+        try:
+            self.call(self.loader.load(self.services), self.startup_timeout)
+        except Exception as exc:
+            logger.trace("{}: services were not loaded: {!r}. Stopping.", self, exc)
+            self.__exit__(None, None, None)
+            msg = f"{self}: application was not started. Check logs."
+            raise RuntimeError(msg) from exc
+
+        self.server.transport = KookitASGITransport(self.loader.app, self.loop)
+        self.server.serving = self
+        return self
+
+    def __exit__(
+        self,
+        typ: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.server.transport = None
+        self.server.serving = None
+        logger.trace("{}: unloading services ({} seconds)", self, self.shutdown_timeout)
+        try:
+            self.call(self.loader.unload(), self.shutdown_timeout)
+        except FutureTimeoutError:
+            logger.trace("{}: services were not unloaded in time. Abandoning the loop.", self)
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(self.shutdown_timeout)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+
+class KookitASGIServer:
+    def __init__(self, *, host: str = "127.0.0.1") -> None:
+        # the port is reserved, not listened to, so the URL stays unique
+        self.socket: Final = bind_port(host)
+        self.host: Final[str] = host
+        self.port: Final[int] = self.socket.getsockname()[1]
+        # the port is released once the server is gone, if it's never closed
+        Finalize(self, self.socket.close, exitpriority=0)
+        self.url: Final[str] = f"http://{host}:{self.port}"
+        self.workers: Final = 1
+        self.transport: KookitASGITransport | None = None
+        self.serving: ASGIServing | None = None
+
+    def __str__(self) -> str:
+        return "[KookitASGIServer]"
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def update(self, service: IService, *, timeout: float) -> None:
+        if not self.serving:
+            # services are being loaded and get routed once lifespans are entered
+            return
+        self.serving.call(self.serving.loader.update(service), timeout)
+
+    def serve(
+        self,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> ASGIServing:
+        return ASGIServing(
+            self,
+            services,
+            startup_timeout=startup_timeout,
+            shutdown_timeout=shutdown_timeout,
+            parent=parent,
+        )
+
+
+def patch_httpx(
+    mocker: MockerFixture,
+    resolve: Callable[[URL], KookitASGITransport | None],
+) -> None:
+    handle_request = HTTPTransport.handle_request
+    handle_async_request = AsyncHTTPTransport.handle_async_request
+
+    def patched_handle_request(transport: HTTPTransport, request: Request) -> Response:
+        asgi_transport = resolve(request.url)
+        if asgi_transport:
+            return asgi_transport.handle_request(request)
+        return handle_request(transport, request)
+
+    async def patched_handle_async_request(
+        transport: AsyncHTTPTransport,
+        request: Request,
+    ) -> Response:
+        asgi_transport = resolve(request.url)
+        if asgi_transport:
+            return await asgi_transport.handle_async_request(request)
+        return await handle_async_request(transport, request)
+
+    mocker.patch.object(HTTPTransport, "handle_request", patched_handle_request)
+    mocker.patch.object(AsyncHTTPTransport, "handle_async_request", patched_handle_async_request)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from hashlib import sha256
+from typing import TYPE_CHECKING, Final
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from starlette.types import Receive
+
+    from .response_group import ResponseGroup
+
+
+class BodyDigest:
+    """Length and hash of an expected request body, so it's never compared byte for byte."""
+
+    __slots__ = ("digest", "length")
+
+    def __init__(self, content: bytes) -> None:
+        self.length: Final = len(content)
+        self.digest: Final = sha256(content).digest()
+
+    def matches(self, length: int, digest: bytes) -> bool:
+        return self.length == length and self.digest == digest
+
+
+class BodyMatch:
+    """Narrows candidate groups (in declaration order) down while a request body comes in.
+
+    The body is hashed once whatever the number of candidates, and the candidates expecting
+    another length are dropped as soon as it's known, so the winner may be found early.
+    Up to `keep` bytes of the body are kept, e.g. for the journal.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[ResponseGroup],
+        length: int | None = None,
+        *,
+        keep: int = 0,
+    ) -> None:
+        self.length: Final = length
+        self.keep: Final = keep
+        self.received: int = 0
+        self.hash = sha256()
+        self.head = bytearray()
+        self.candidates: list[ResponseGroup] = []
+        self.reset(candidates)
+
+    def fits(self, group: ResponseGroup) -> bool:
+        if not group.body:
+            return True
+        if self.length is not None and group.body.length != self.length:
+            return False
+        return group.body.length >= self.received
+
+    def reset(self, candidates: Sequence[ResponseGroup]) -> None:
+        """Narrow other candidates down, with the body fed so far."""
+        self.candidates = [group for group in candidates if self.fits(group)]
+
+    @property
+    def decided(self) -> bool:
+        # groups without a body matcher match any body
+        return not self.candidates or not self.candidates[0].body
+
+    @property
+    def kept(self) -> bool:
+        return len(self.head) >= self.keep
+
+    def feed(self, chunk: bytes) -> None:
+        if not self.kept:
+            self.head += chunk[: self.keep - len(self.head)]
+        self.received += len(chunk)
+        self.hash.update(chunk)
+        self.reset(self.candidates)
+
+    def result(self) -> ResponseGroup | None:
+        """Return the first candidate that matches the body fed so far."""
+        if self.decided:
+            return self.candidates[0] if self.candidates else None
+        digest: bytes = self.hash.digest()
+        return next(
+            (
+                group
+                for group in self.candidates
+                if not group.body or group.body.matches(self.received, digest)
+            ),
+            None,
+        )
+
+
+async def match_body(
+    receive: Receive,
+    candidates: Callable[[], Sequence[ResponseGroup]],
+    *,
+    length: int | None = None,
+    keep: int = 0,
+) -> tuple[ResponseGroup | None, bytes]:
+    """Stream the request body into a match, stopping as soon as the match is decided.
+
+    The group matched is claimed. When a concurrent request claims it first, the match goes
+    on with the groups that are still available. The group is returned with up to `keep`
+    bytes of the body, which is read that far even when the match is decided earlier.
+    """
+    match = BodyMatch(candidates(), length, keep=keep)
+    more_body: bool = True
+    while True:
+        while more_body and not (match.decided and match.kept):
+            message = await receive()
+            match.feed(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        group: ResponseGroup | None = match.result()
+        if not group or group.claim():
+            return group, bytes(match.head)
+        match.reset(candidates())
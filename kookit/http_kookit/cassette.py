@@ -0,0 +1,333 @@
+from __future__ import annotations
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.routing import Route
+
+from kookit.logging import logger
+from .states import GroupStates
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from starlette.types import Receive, Scope, Send
+
+
+__all__ = ["Cassette"]
+
+
+METHODS: Final = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+# hop-by-hop headers, and those that don't hold for the content as recorded
+SKIPPED_HEADERS: Final = frozenset(
+    {b"host", b"connection", b"content-length", b"content-encoding", b"transfer-encoding"}
+)
+
+
+def request_target(scope: Scope) -> bytes:
+    query: bytes = scope.get("query_string", b"")
+    path: bytes = scope.get("raw_path") or scope["path"].encode()
+    return path + b"?" + query if query else path
+
+
+def encode_headers(headers: Iterable[tuple[bytes, bytes]]) -> bytes:
+    return b"".join(
+        key + b": " + value + b"\r\n"
+        for key, value in headers
+        if key.lower() not in SKIPPED_HEADERS
+    )
+
+
+async def respond(send: Send, status: int, headers: bytes, content: bytes) -> None:
+    raw_headers: list[tuple[bytes, bytes]] = [
+        (key.lower(), value)
+        for key, _, value in (line.partition(b": ") for line in headers.split(b"\r\n") if line)
+    ]
+    raw_headers.append((b"content-length", str(len(content)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": content})
+
+
+class Cassette:
+    """Interactions with an upstream recorded into a file, to be replayed by services.
+
+    A service proxies to the upstream with the router of `record`: every interaction is
+    appended to the file by a single write under a lock, whatever the number of workers.
+    The file is then sealed with an index of the interactions sorted by a hash of their
+    method and path. A service replays it with the router of `replay`: the file is mapped
+    into memory and requests are looked up with a binary search of the index, so the
+    interactions are never loaded into Python objects, however many were recorded.
+    """
+
+    MAGIC: Final = b"KKCT"
+    VERSION: Final = 1
+    HEADER: Final = struct.Struct("<4sH")
+    # record size, lengths of the method, target and request body, status, lengths of
+    # the response headers and content; followed by the fields in that order
+    RECORD: Final = struct.Struct("<IHIIHII")
+    # index offset, number of interactions; the index is their key hashes then offsets
+    TRAILER: Final = struct.Struct("<QQ4s")
+    INDEX_MAGIC: Final = b"KKIX"
+    KEY: Final = struct.Struct("<Q")
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path: Final = Path(path)
+
+    def __str__(self) -> str:
+        return f"[Cassette({self.path.name})]"
+
+    @staticmethod
+    def key(method: bytes, path: bytes) -> int:
+        digest: bytes = blake2b(method + b" " + path, digest_size=Cassette.KEY.size).digest()
+        return Cassette.KEY.unpack(digest)[0]
+
+    def trailer(self) -> tuple[int, int] | None:
+        """Return the index offset and the number of interactions of a sealed cassette."""
+        with self.path.open("rb") as file:
+            magic, version = self.HEADER.unpack(file.read(self.HEADER.size))
+            if magic != self.MAGIC or version != self.VERSION:
+                msg = f"{self}: not a cassette of version {self.VERSION}"
+                raise ValueError(msg)
+            size: int = file.seek(0, os.SEEK_END)
+            if size < self.HEADER.size + self.TRAILER.size:
+                return None
+            file.seek(size - self.TRAILER.size)
+            offset, count, index_magic = self.TRAILER.unpack(file.read(self.TRAILER.size))
+        sealed: bool = index_magic == self.INDEX_MAGIC and (
+            offset + 2 * count * self.KEY.size + self.TRAILER.size == size
+        )
+        return (offset, count) if sealed else None
+
+    def scan(self) -> Iterator[tuple[int, int, bytes, bytes]]:
+        """Yield the offset, size, method and path of the interactions recorded, in order."""
+        trailer: tuple[int, int] | None = self.trailer()
+        with self.path.open("rb") as file:
+            end: int = trailer[0] if trailer else file.seek(0, os.SEEK_END)
+            offset: int = file.seek(self.HEADER.size)
+            while offset + self.RECORD.size <= end:
+                size, method_length, target_length, *_ = self.RECORD.unpack(
+                    file.read(self.RECORD.size)
+                )
+                if offset + size > end:
+                    # cut short by a recording that was interrupted
+                    return
+                method: bytes = file.read(method_length)
+                target: bytes = file.read(target_length)
+                yield offset, size, method, target.partition(b"?")[0]
+                offset = file.seek(offset + size)
+
+    def __len__(self) -> int:
+        trailer: tuple[int, int] | None = self.trailer()
+        return trailer[1] if trailer else sum(1 for _ in self.scan())
+
+    def append(
+        self,
+        method: bytes,
+        target: bytes,
+        body: bytes,
+        status: int,
+        headers: bytes,
+        content: bytes,
+    ) -> None:
+        fields: tuple[bytes, ...] = (method, target, body, headers, content)
+        size: int = self.RECORD.size + sum(len(field) for field in fields)
+        record: bytes = self.RECORD.pack(
+            size, len(method), len(target), len(body), status, len(headers), len(content)
+        )
+        with self.path.open("ab") as file:
+            if fcntl:
+                fcntl.lockf(file, fcntl.LOCK_EX)
+            file.write(record + b"".join(fields))
+
+    def seal(self) -> None:
+        """Write the index of the interactions, unless the cassette is sealed already."""
+        if self.trailer():
+            return
+        entries: list[tuple[int, int]] = []
+        index_offset: int = self.HEADER.size
+        for offset, size, method, path in self.scan():
+            entries.append((self.key(method, path), offset))
+            index_offset = offset + size
+        # sorted by offset too, so that interactions of a key stay in recorded order
+        entries.sort()
+        count: int = len(entries)
+        with self.path.open("r+b") as file:
+            # whatever an interrupted recording has left is cut
+            file.truncate(index_offset)
+            file.seek(index_offset)
+            file.write(struct.pack(f"<{count}Q", *(key for key, _ in entries)))
+            file.write(struct.pack(f"<{count}Q", *(offset for _, offset in entries)))
+            file.write(self.TRAILER.pack(index_offset, count, self.INDEX_MAGIC))
+        logger.trace("{}: sealed with {} interactions", self, count)
+
+    def record(self, upstream: str) -> APIRouter:
+        """Return a router proxying every request to the upstream, recording interactions."""
+        if not self.path.exists():
+            self.path.write_bytes(self.HEADER.pack(self.MAGIC, self.VERSION))
+        trailer: tuple[int, int] | None = self.trailer()
+        if trailer:
+            # recorded on to the interactions, the index gets written again
+            with self.path.open("r+b") as file:
+                file.truncate(trailer[0])
+        router = APIRouter()
+        router.routes.append(
+            Route("/{path:path}", CassetteRecorder(self, upstream), methods=METHODS)
+        )
+        return router
+
+    def replay(self) -> APIRouter:
+        """Return a router serving the interactions recorded, each one once."""
+        self.seal()
+        router = APIRouter()
+        router.routes.append(Route("/{path:path}", CassettePlayer(self), methods=METHODS))
+        return router
+
+
+class CassetteRecorder:
+    def __init__(self, cassette: Cassette, upstream: str) -> None:
+        self.cassette: Final = cassette
+        self.upstream: Final = upstream
+
+    def __str__(self) -> str:
+        return f"[CassetteRecorder({self.cassette.path.name}, {self.upstream})]"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body: bytes = await Request(scope, receive).body()
+        method: bytes = scope["method"].encode("latin-1")
+        target: bytes = request_target(scope)
+        # clients of the follow-up requests are kept by each serving process
+        client = scope["app"].state.follow_up_runner.client(self.upstream)
+        response = await client.request(
+            scope["method"],
+            target.decode("latin-1"),
+            content=body,
+            headers=[(k, v) for k, v in scope["headers"] if k.lower() not in SKIPPED_HEADERS],
+        )
+        headers: bytes = encode_headers(response.headers.raw)
+        logger.trace("{}: recording <'{}', {}>: {}", self, method, target, response.status_code)
+        self.cassette.append(method, target, body, response.status_code, headers, response.content)
+        await respond(send, response.status_code, headers, response.content)
+
+
+class CassettePlayer:
+    """The interactions of a sealed cassette, mapped into memory and played once each.
+
+    Interactions of the method and the path of a request are played in recorded order,
+    those recorded with the same query and body first. Which of them have been played is
+    shared by the serving processes in the states of the cassette.
+    """
+
+    def __init__(self, cassette: Cassette, *, states: GroupStates | None = None) -> None:
+        self.cassette: Final = cassette
+        trailer: tuple[int, int] | None = cassette.trailer()
+        if not trailer:
+            msg = f"{cassette}: cannot replay a cassette that is not sealed"
+            raise ValueError(msg)
+        self.index_offset, self.count = trailer
+        with cassette.path.open("rb") as file:
+            self.data: Final = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.states: Final = states or GroupStates(self.count)
+
+    def __str__(self) -> str:
+        return f"[CassettePlayer({self.cassette.path.name})]"
+
+    def __getstate__(self) -> dict:
+        # the mapping is opened again, the states are shared by name
+        return {"cassette": self.cassette, "states": self.states}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["cassette"], states=state["states"])  # type: ignore[misc]
+
+    def key(self, position: int) -> int:
+        return Cassette.KEY.unpack_from(
+            self.data, self.index_offset + position * Cassette.KEY.size
+        )[0]
+
+    def offset(self, position: int) -> int:
+        start: int = self.index_offset + (self.count + position) * Cassette.KEY.size
+        return Cassette.KEY.unpack_from(self.data, start)[0]
+
+    def candidates(self, method: bytes, path: bytes) -> list[int]:
+        """Return the positions in the index of the interactions of a method and a path."""
+        key: int = Cassette.key(method, path)
+        low, high = 0, self.count
+        while low < high:
+            middle: int = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        positions: list[int] = []
+        while low < self.count and self.key(low) == key:
+            fields: list[memoryview] = self.fields(low)[1]
+            # keys may collide
+            if fields[0] == method and bytes(fields[1]).partition(b"?")[0] == path:
+                positions.append(low)
+            low += 1
+        return positions
+
+    def fields(self, position: int) -> tuple[int, list[memoryview]]:
+        """Return the status and the fields of an interaction, viewed in place."""
+        offset: int = self.offset(position)
+        _, method, target, body, status, headers, content = Cassette.RECORD.unpack_from(
+            self.data, offset
+        )
+        offset += Cassette.RECORD.size
+        data = memoryview(self.data)
+        fields: list[memoryview] = []
+        for length in (method, target, body, headers, content):
+            fields.append(data[offset : offset + length])
+            offset += length
+        return status, fields
+
+    def play(self, method: bytes, target: bytes, body: bytes) -> tuple[int, bytes, bytes] | None:
+        """Claim the interaction of a request: return its status, headers and content."""
+        while True:
+            positions: list[int] = [
+                position
+                for position in self.candidates(method, target.partition(b"?")[0])
+                if self.states.available(position)
+            ]
+            if not positions:
+                return None
+            exact: list[int] = [
+                position
+                for position in positions
+                if self.fields(position)[1][1:3] == [target, body]
+            ]
+            position: int = (exact or positions)[0]
+            if self.states.claim(position):
+                self.states.deactivate(position)
+                status, fields = self.fields(position)
+                return status, bytes(fields[3]), bytes(fields[4])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body: bytes = await Request(scope, receive).body()
+        method: bytes = scope["method"].encode("latin-1")
+        target: bytes = request_target(scope)
+        played: tuple[int, bytes, bytes] | None = self.play(method, target, body)
+        if not played:
+            logger.trace("{}: no interaction left for <'{}', {}>", self, method, target)
+            response = JSONResponse(
+                {
+                    "error": f"{self}: cannot find interaction for request:"
+                    f" <'{scope['method']}', {target.decode('latin-1')}>"
+                },
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+        await respond(send, *played)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Final, Iterable
+
+from starlette.routing import compile_path
+
+from .body import BodyMatch
+
+
+if TYPE_CHECKING:
+    from re import Pattern
+
+    from .interfaces import IRequest
+    from .response_group import ResponseGroup
+
+
+class Bucket:
+    def __init__(self) -> None:
+        self.groups: Final[list[tuple[int, ResponseGroup]]] = []
+        self.start: int = 0
+
+    def add(self, position: int, group: ResponseGroup) -> None:
+        self.groups.append((position, group))
+
+    def find(
+        self,
+        request: IRequest,
+        headers: frozenset[tuple[str, str]],
+    ) -> list[tuple[int, ResponseGroup]]:
+        # consumed groups at the head of the bucket are never looked at again
+        while self.start < len(self.groups) and not self.groups[self.start][1].active:
+            self.start += 1
+
+        found: list[tuple[int, ResponseGroup]] = []
+        for index in range(self.start, len(self.groups)):
+            position, group = self.groups[index]
+            if group.matches(request, headers):
+                found.append((position, group))
+                if not group.body:
+                    # any body matches it, so the groups after it are never picked
+                    break
+        return found
+
+
+class DispatchIndex:
+    def __init__(self, groups: Iterable[ResponseGroup] = ()) -> None:
+        self.static: Final[dict[tuple[str, str], Bucket]] = {}
+        self.templates: Final[dict[str, dict[str, tuple[Pattern, Bucket]]]] = {}
+
+        for position, group in enumerate(groups):
+            if group.responds:
+                self.bucket(group.method, group.path).add(position, group)
+
+    def bucket(self, method: str, path: str) -> Bucket:
+        regex, _, convertors = compile_path(path)
+        if not convertors:
+            return self.static.setdefault((method, path), Bucket())
+
+        templates = self.templates.setdefault(method, {})
+        if path not in templates:
+            templates[path] = (regex, Bucket())
+        return templates[path][1]
+
+    def candidates(self, request: IRequest) -> list[ResponseGroup]:
+        """Return the groups matching a request but its body, in declaration order."""
+        path: str = request.url.path
+        buckets: list[Bucket] = [
+            bucket
+            for regex, bucket in self.templates.get(request.method, {}).values()
+            if regex.match(path)
+        ]
+        static = self.static.get((request.method, path))
+        if static:
+            buckets.append(static)
+
+        headers: frozenset[tuple[str, str]] = frozenset(request.headers.items())
+        if len(buckets) == 1:
+            return [group for _, group in buckets[0].find(request, headers)]
+        found = [match for bucket in buckets for match in bucket.find(request, headers)]
+        return [group for _, group in sorted(found, key=lambda match: match[0])]
+
+    def lookup(self, request: IRequest) -> ResponseGroup | None:
+        """Return the first group matching a request with its whole body read."""
+        match = BodyMatch(self.candidates(request), len(request.content))
+        match.feed(request.content)
+        return match.result()
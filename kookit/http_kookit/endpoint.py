@@ -0,0 +1,40 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Final
+
+from starlette.datastructures import URL, Headers
+
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from starlette.types import Receive, Scope, Send
+
+
+class IncomingRequest:
+    """A request without its body, which is streamed into a body match instead."""
+
+    __slots__ = ("content", "headers", "method", "path_params", "url")
+
+    def __init__(self, scope: Scope, content: bytes = b"") -> None:
+        self.content: Final = content
+        self.headers: Final = Headers(scope=scope)
+        self.url: Final = URL(scope=scope)
+        self.method: Final[str] = scope["method"]
+        self.path_params: Final[dict] = scope.get("path_params", {})
+
+    @property
+    def content_length(self) -> int | None:
+        try:
+            return int(self.headers["content-length"])
+        except (KeyError, ValueError):
+            return None
+
+
+class ServiceEndpoint:
+    """A raw ASGI endpoint: routes call it as is, without request/response wrapping."""
+
+    def __init__(self, handle: Callable[[Scope, Receive, Send], Awaitable[Any]]) -> None:
+        self.handle: Final = handle
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.handle(scope, receive, send)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import asyncio
+from bisect import bisect_right
+from math import log
+from random import Random
+from typing import TYPE_CHECKING, Final, Mapping, Protocol, Union
+
+import anyio
+from starlette.responses import JSONResponse
+
+
+if TYPE_CHECKING:
+    import logging
+
+    from starlette.types import Message, Receive, Scope, Send
+
+
+__all__ = ["Faults", "LogNormalLatency", "NormalLatency", "PercentileLatency"]
+
+
+class InjectedFault(Exception):  # noqa: N818
+    """Fails a response on purpose, so that the server drops its connection."""
+
+
+def quiet_injected_faults(record: logging.LogRecord) -> bool:
+    """Keep the failures of responses with injected faults out of the server logs."""
+    return not (record.exc_info and isinstance(record.exc_info[1], InjectedFault))
+
+
+class ILatency(Protocol):
+    def sample(self, random: Random) -> float: ...
+
+
+class NormalLatency:
+    def __init__(self, mean: float, stddev: float) -> None:
+        self.mean: Final = mean
+        self.stddev: Final = stddev
+
+    def sample(self, random: Random) -> float:
+        return max(random.gauss(self.mean, self.stddev), 0)
+
+
+class LogNormalLatency:
+    """Long-tailed latency: half of the samples are below the median."""
+
+    def __init__(self, median: float, sigma: float) -> None:
+        self.median: Final = median
+        self.sigma: Final = sigma
+
+    def sample(self, random: Random) -> float:
+        return random.lognormvariate(log(self.median), self.sigma)
+
+
+class PercentileLatency:
+    """Latency following a table of percentiles, e.g. {50: 0.01, 99: 0.2, 100: 1}.
+
+    Samples are interpolated between the percentiles, from zero up to the first one.
+    """
+
+    def __init__(self, percentiles: Mapping[float, float]) -> None:
+        points = sorted(percentiles.items())
+        if not points or not all(0 < percentile <= 100 for percentile, _ in points):  # noqa: PLR2004
+            msg = f"percentiles should be in (0, 100]: {dict(percentiles)}"
+            raise ValueError(msg)
+        self.percentiles: Final = [0.0, *(float(percentile) for percentile, _ in points)]
+        self.latencies: Final = [0.0, *(float(latency) for _, latency in points)]
+
+    def sample(self, random: Random) -> float:
+        percentile: float = random.uniform(0, self.percentiles[-1])
+        index: int = min(bisect_right(self.percentiles, percentile), len(self.percentiles) - 1)
+        low, high = self.percentiles[index - 1], self.percentiles[index]
+        share: float = (percentile - low) / (high - low)
+        return self.latencies[index - 1] + share * (
+            self.latencies[index] - self.latencies[index - 1]
+        )
+
+
+ILatencyValue = Union[float, ILatency]
+
+
+class Faults:
+    """Latency and failures injected into the scripted responses, inside the server's loop.
+
+    `latency` delays the whole response, `first_byte` only its body (headers are sent
+    right away). A request may be failed instead of served, with the given rates:
+    `error_rate` sends `error_status`, `reset_rate` drops the connection after the headers
+    and `timeout_rate` holds the response until the client leaves (or for `hang` seconds)
+    then drops the connection. A failed request doesn't consume its response.
+    """
+
+    FAULTS: Final = ("reset", "timeout", "error")
+
+    def __init__(
+        self,
+        *,
+        latency: ILatencyValue = 0,
+        first_byte: ILatencyValue = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        reset_rate: float = 0,
+        timeout_rate: float = 0,
+        hang: float = 30,
+        seed: int | None = None,
+    ) -> None:
+        if error_rate + reset_rate + timeout_rate > 1:
+            msg = f"fault rates add up to more than 1: {error_rate}, {reset_rate}, {timeout_rate}"
+            raise ValueError(msg)
+        self.latency: Final = latency
+        self.first_byte: Final = first_byte
+        self.error_status: Final = error_status
+        self.rates: Final = (reset_rate, timeout_rate, error_rate)
+        self.hang: Final = hang
+        self.random: Final = Random(seed)  # noqa: S311
+
+    def __str__(self) -> str:
+        return f"[Faults({', '.join(f'{f}={r}' for f, r in zip(self.FAULTS, self.rates))})]"
+
+    def sample(self, latency: ILatencyValue) -> float:
+        if isinstance(latency, (int, float)):
+            return latency
+        return latency.sample(self.random)
+
+    def draw(self) -> str | None:
+        """Return the fault to inject into a request, if any."""
+        draw: float = self.random.random()
+        for fault, rate in zip(self.FAULTS, self.rates):
+            if draw < rate:
+                return fault
+            draw -= rate
+        return None
+
+    async def delay(self) -> None:
+        latency: float = self.sample(self.latency)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    def delayed(self, send: Send) -> Send:
+        first_byte: float = self.sample(self.first_byte)
+        if first_byte <= 0:
+            return send
+
+        async def delayed_send(message: Message) -> None:
+            nonlocal first_byte
+            if message["type"] != "http.response.start" and first_byte:
+                await asyncio.sleep(first_byte)
+                first_byte = 0
+            await send(message)
+
+        return delayed_send
+
+    async def inject(self, fault: str, scope: Scope, receive: Receive, send: Send) -> None:
+        if fault == "error":
+            response = JSONResponse(
+                {"error": f"{self}: injected error"}, status_code=self.error_status
+            )
+            await response(scope, receive, send)
+            return
+
+        if fault == "timeout":
+            with anyio.move_on_after(self.hang):
+                while (await receive())["type"] != "http.disconnect":
+                    pass
+
+        # servers drop the connection of an application failing in the middle of a response
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-length", b"1")],
+            }
+        )
+        msg = f"{self}: injected connection {fault}"
+        raise InjectedFault(msg)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import asyncio
+from typing import TYPE_CHECKING, Final
+
+from httpx import AsyncClient
+
+from kookit.logging import logger
+
+
+if TYPE_CHECKING:
+    from .response_group import ResponseGroup
+
+
+class FollowUpRunner:
+    def __init__(self) -> None:
+        self.clients: Final[dict[str, AsyncClient]] = {}
+        self.tasks: Final[set[asyncio.Task]] = set()
+
+    def __str__(self) -> str:
+        return "[FollowUpRunner]"
+
+    def client(self, base_url: str) -> AsyncClient:
+        if base_url not in self.clients:
+            self.clients[base_url] = AsyncClient(base_url=base_url, timeout=60)
+        return self.clients[base_url]
+
+    def run(self, group: ResponseGroup) -> None:
+        task = asyncio.get_running_loop().create_task(group.run_requests(self))
+        self.tasks.add(task)
+        task.add_done_callback(self.done)
+
+    def done(self, task: asyncio.Task) -> None:
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error("{}: follow-up requests failed: {!r}", self, task.exception())
+
+    async def aclose(self) -> None:
+        logger.trace("{}: cancelling {} tasks", self, len(self.tasks))
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
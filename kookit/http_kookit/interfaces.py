@@ -1,14 +1,18 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Callable, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Mapping
+    from collections.abc import Mapping, Sequence
+    from contextlib import AbstractContextManager
 
     from fastapi import APIRouter
-    from httpx import URL
+    from starlette.datastructures import URL
+    from starlette.types import Scope, Send
 
     from kookit.utils import ILifespan
+    from .journal import RequestJournal
+    from .response_group import ResponseGroup
 
 
 class IRequest(Protocol):
@@ -28,13 +32,44 @@ class IRequest(Protocol):
     def path_params(self) -> dict: ...
 
 
+class IBodySource(Protocol):
+    """Sends a response (the start message may be amended) instead of the encoded body."""
+
+    async def respond(self, scope: Scope, start: dict, send: Send) -> None: ...
+
+
+class IService(Protocol):
+    def router(self) -> APIRouter: ...
+
+    @property
+    def key(self) -> str: ...
+
+    @property
+    def lifespan(self) -> ILifespan: ...
+
+    @property
+    def response_groups(self) -> Sequence[ResponseGroup]: ...
+
+    @property
+    def journal(self) -> RequestJournal: ...
+
+
 class IServer(Protocol):
-    def wait(self, timeout: float | None = None) -> Any: ...
-    def run(
+    def serve(
         self,
-        routers: Iterable[Callable[[], APIRouter]],
-        lifespans: Iterable[ILifespan],
-    ) -> None: ...
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> AbstractContextManager: ...
+
+    def update(self, service: IService, *, timeout: float) -> None: ...
+
+    def close(self) -> None: ...
 
     @property
     def url(self) -> str: ...
+
+    @property
+    def workers(self) -> int: ...
@@ -0,0 +1,277 @@
+from __future__ import annotations
+import struct
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+from multiprocess.shared_memory import SharedMemory
+from multiprocess.util import Finalize
+
+from .endpoint import IncomingRequest
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+__all__ = ["Call", "JournalMiddleware", "RequestJournal"]
+
+
+def release(memory: SharedMemory, *, unlink: bool) -> None:
+    memory.close()
+    if unlink:
+        memory.unlink()
+
+
+@dataclass(frozen=True)
+class Call:
+    """A request received by a service, as recorded in its journal."""
+
+    method: str
+    target: str
+    headers: tuple[tuple[str, str], ...]
+    body: bytes
+    body_length: int | None
+    route: tuple[str, str] | None
+    received_at: float
+    duration: float
+    worker: int
+
+    @property
+    def path(self) -> str:
+        return self.target.partition("?")[0]
+
+
+class RequestJournal:
+    """The last requests received by a service, in a ring of fixed size slots per worker.
+
+    The journal lives in named shared memory like the metrics: every worker appends to its
+    own ring, so there is a single writer per ring, and the test process reads the records
+    with no round trip to the server. A slot is written between two stores of its sequence
+    number, so that a slot being overwritten is never read. Whatever doesn't fit into a slot
+    (headers, body) is cut, the oldest records are overwritten: the memory is bounded.
+    """
+
+    CAPACITY: Final = 1024
+    SLOT_SIZE: Final = 1024
+    # sequence, received at, duration, body length (or -1), lengths of the fields
+    RECORD: Final = struct.Struct("<QddqIIIII")
+    COUNTER: Final = struct.Struct("<Q")
+
+    def __init__(
+        self,
+        capacity: int = CAPACITY,
+        *,
+        shards: int = 1,
+        slot_size: int = SLOT_SIZE,
+        name: str | None = None,
+    ) -> None:
+        self.capacity: Final = capacity
+        self.shards: Final = shards
+        self.slot_size: Final = slot_size
+        self.shard_size: Final = self.COUNTER.size + capacity * slot_size
+        self.owner: Final = name is None
+        self.memory: Final = SharedMemory(
+            name, create=self.owner, size=max(self.shard_size * shards, 1)
+        )
+        # also released once the journal is gone, if it's never closed
+        self.finalizer: Final = Finalize(
+            self, release, args=(self.memory,), kwargs={"unlink": self.owner}, exitpriority=0
+        )
+
+    def __str__(self) -> str:
+        return f"[RequestJournal({self.memory.name})]"
+
+    def __getstate__(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "shards": self.shards,
+            "slot_size": self.slot_size,
+            "name": self.memory.name,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(  # type: ignore[misc]
+            state["capacity"],
+            shards=state["shards"],
+            slot_size=state["slot_size"],
+            name=state["name"],
+        )
+
+    def append(
+        self,
+        scope: Scope,
+        body: bytes,
+        body_length: int | None,
+        route: tuple[str, str] | None,
+        *,
+        received_at: float,
+        duration: float,
+        shard: int = 0,
+    ) -> None:
+        if not self.capacity:
+            return
+        buf = self.memory.buf
+        base: int = shard * self.shard_size
+        (count,) = self.COUNTER.unpack_from(buf, base)
+        offset: int = base + self.COUNTER.size + count % self.capacity * self.slot_size
+
+        query: bytes = scope.get("query_string", b"")
+        fields: list[bytes] = [
+            scope["method"].encode("latin-1"),
+            (scope.get("raw_path") or scope["path"].encode()) + (b"?" + query if query else b""),
+            " ".join(route).encode() if route else b"",
+            b"".join(key + b": " + value + b"\r\n" for key, value in scope["headers"]),
+            body,
+        ]
+        space: int = self.slot_size - self.RECORD.size
+        lengths: list[int] = []
+        for field in fields:
+            lengths.append(min(len(field), space))
+            space -= lengths[-1]
+        payload: bytes = b"".join(fields)[: self.slot_size - self.RECORD.size]
+
+        # a zero sequence number marks the slot as being written
+        self.COUNTER.pack_into(buf, offset, 0)
+        position: int = offset + self.RECORD.size
+        buf[position : position + len(payload)] = payload
+        self.RECORD.pack_into(
+            buf,
+            offset,
+            count + 1,
+            received_at,
+            duration,
+            -1 if body_length is None else body_length,
+            *lengths,
+        )
+        self.COUNTER.pack_into(buf, base, count + 1)
+
+    def __len__(self) -> int:
+        """Return the number of requests recorded, including those overwritten since."""
+        return sum(
+            self.COUNTER.unpack_from(self.memory.buf, shard * self.shard_size)[0]
+            for shard in range(self.shards)
+        )
+
+    def read(self, shard: int) -> Iterator[Call]:
+        buf = self.memory.buf
+        base: int = shard * self.shard_size
+        (count,) = self.COUNTER.unpack_from(buf, base)
+        for sequence in range(max(count - self.capacity, 0), count):
+            offset: int = base + self.COUNTER.size + sequence % self.capacity * self.slot_size
+            slot: bytes = bytes(buf[offset : offset + self.slot_size])
+            number, received_at, duration, body_length, *lengths = self.RECORD.unpack_from(slot)
+            if number != sequence + 1 or self.RECORD.unpack_from(buf, offset)[0] != number:
+                # overwritten meanwhile
+                continue
+
+            fields: list[bytes] = []
+            position: int = self.RECORD.size
+            for length in lengths:
+                fields.append(slot[position : position + length])
+                position += length
+            method, target, route, headers, body = fields
+            route_method, _, route_path = route.decode().partition(" ")
+            yield Call(
+                method=method.decode("latin-1"),
+                target=target.decode("latin-1"),
+                headers=tuple(
+                    (key, value)
+                    for key, _, value in (
+                        line.decode("latin-1").partition(": ")
+                        for line in headers.split(b"\r\n")
+                        if line
+                    )
+                ),
+                body=body,
+                body_length=None if body_length < 0 else body_length,
+                route=(route_method, route_path) if route else None,
+                received_at=received_at,
+                duration=duration,
+                worker=shard,
+            )
+
+    def calls(self, method: str | None = None, path: str | None = None) -> list[Call]:
+        """Return the calls kept in the order they were received, of a route (or a path)."""
+        calls: list[Call] = sorted(
+            (call for shard in range(self.shards) for call in self.read(shard)),
+            key=lambda call: call.received_at,
+        )
+        return [
+            call
+            for call in calls
+            if (method is None or call.method == method)
+            and (path is None or path in (call.path, call.route[1] if call.route else None))
+        ]
+
+    def close(self) -> None:
+        self.finalizer()
+
+
+class JournalMiddleware:
+    """Records every request a server receives into the journal of the service it's for.
+
+    Whatever the route, scripted responses, routers of the service or none at all, a request
+    is recorded once its response is done, before its last message is sent. A request routed
+    to none of the services of the server is recorded by all of them. Scripted endpoints
+    leave the route of the group they matched (or None) under `ROUTE` in the scope.
+    """
+
+    ROUTE: Final = "kookit.route"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: Final = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received_at: float = time.time()
+        started_at: float = time.perf_counter()
+        state = scope["app"].state
+        journals: list[RequestJournal] = state.journals
+        keep: int = max((journal.slot_size for journal in journals), default=0)
+        body = bytearray()
+        recorded: bool = False
+
+        async def receive_recorded() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and len(body) < keep:
+                body.extend(message.get("body", b"")[: keep - len(body)])
+            return message
+
+        def record() -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+
+            journal: RequestJournal | None = state.route_journals.get(id(scope.get("endpoint")))
+            if self.ROUTE in scope:
+                matched: tuple[str, str] | None = scope[self.ROUTE]
+            else:
+                route: Any = scope.get("route")
+                matched = (scope["method"], route.path) if journal is not None and route else None
+            for target in journals if journal is None else [journal]:
+                target.append(
+                    scope,
+                    bytes(body),
+                    IncomingRequest(scope).content_length,
+                    matched,
+                    received_at=received_at,
+                    duration=time.perf_counter() - started_at,
+                    shard=state.worker,
+                )
+
+        async def send_recorded(message: Message) -> None:
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive_recorded, send_recorded)
+        finally:
+            record()
@@ -1,38 +1,53 @@
 from __future__ import annotations
 import os
-from itertools import cycle
 from typing import TYPE_CHECKING, Final, Iterable
 
-from multiprocess import Process
 from typing_extensions import Self
 
 from kookit.logging import logger
-from kookit.utils import ProcessManager
+from kookit.utils import ProcessManager, start_all, stop_all
+from .asgi import KookitASGIServer, patch_httpx
+from .journal import RequestJournal
 from .server import KookitHTTPServer
 from .service import KookitHTTPService
 
 
 if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
     from types import TracebackType
 
     from fastapi import APIRouter
+    from httpx import URL
     from pytest_mock import MockerFixture
 
     from kookit.utils import ILifespan
+    from .asgi import KookitASGITransport
+    from .faults import Faults
+    from .interfaces import IServer
     from .models import KookitHTTPRequest, KookitHTTPResponse
+    from .pool import KookitHTTPServerPool
 
 
 __all__ = ["HTTPKookit"]
 
 
 class HTTPKookit:
-    server_port: Final[cycle] = cycle(i for i in range(29000, 30000))
-
-    def __init__(self, mocker: MockerFixture) -> None:
+    def __init__(
+        self,
+        mocker: MockerFixture,
+        pool: KookitHTTPServerPool | None = None,
+        *,
+        in_process: bool = False,
+        start_method: str | None = None,
+    ) -> None:
         self.mocker: Final[MockerFixture] = mocker
-        self.server: Final[KookitHTTPServer] = KookitHTTPServer(next(self.server_port))
+        self.pool: Final = pool
+        self.in_process: Final = in_process
+        self.start_method: Final = start_method
+        self.server: Final[IServer] = self.new_server(in_process=in_process)
         self.services: Final[list[KookitHTTPService]] = []
-        self.process_manager: ProcessManager | None = None
+        self.httpx_patched: bool = False
+        self.process_manager: AbstractContextManager | None = None
         self.startup_timeout: float = ProcessManager.DEFAULT_STARTUP_TIMEOUT
         self.shutdown_timeout: float = ProcessManager.DEFAULT_SHUTDOWN_TIMEOUT
 
@@ -54,6 +69,33 @@ class HTTPKookit:
     def __str__(self) -> str:
         return "[HTTPKookit]"
 
+    def new_server(self, *, in_process: bool, workers: int = 1) -> IServer:
+        if in_process:
+            if workers > 1:
+                msg = f"{self}: in process services have a single worker, got {workers}"
+                raise ValueError(msg)
+            return KookitASGIServer()
+        if workers > 1:
+            # pooled servers have a single worker
+            return KookitHTTPServer(workers=workers, start_method=self.start_method)
+        if self.pool:
+            return self.pool.acquire()
+        return KookitHTTPServer(start_method=self.start_method)
+
+    def resolve_transport(self, url: URL) -> KookitASGITransport | None:
+        for server in [self.server, *(s.server for s in self.services)]:
+            if isinstance(server, KookitASGIServer) and (server.host, server.port) == (
+                url.host,
+                url.port,
+            ):
+                return server.transport
+        return None
+
+    def patch_httpx(self) -> None:
+        if not self.httpx_patched:
+            patch_httpx(self.mocker, self.resolve_transport)
+            self.httpx_patched = True
+
     def new_service(
         self,
         env_var: str,
@@ -63,12 +105,18 @@ class HTTPKookit:
         routers: Iterable[APIRouter] = (),
         lifespans: Iterable[ILifespan] = (),
         name: str = "",
+        in_process: bool | None = None,
+        faults: Faults | None = None,
+        workers: int = 1,
+        journal_capacity: int = RequestJournal.CAPACITY,
     ) -> KookitHTTPService:
+        if in_process is None:
+            in_process = self.in_process
+        unique_url = unique_url or in_process != self.in_process or workers > 1
+
         server = self.server
         if unique_url:
-            server = KookitHTTPServer(
-                next(self.server_port),
-            )
+            server = self.new_server(in_process=in_process, workers=workers)
 
         if env_var:
             self.mocker.patch.dict(os.environ, {env_var: server.url})
@@ -79,35 +127,38 @@ class HTTPKookit:
             lifespans=lifespans,
             unique_url=unique_url,
             name=name,
+            faults=faults,
+            journal_capacity=journal_capacity,
         )
         self.services.append(service)
         return service
 
     def __enter__(self) -> Self:
-        # 1. start global server
-        # 2. start all other services' servers.
+        # 1. spawn the global server and all unique services' servers
+        # 2. wait for all of them at once, then start the services
         not_unique = [s for s in self.services if not s.unique_url]
 
-        if not_unique and not self.process_manager:
-            server_process = Process(
-                target=self.server.run,
-                args=(
-                    [s.router for s in not_unique],
-                    [s.lifespan for s in not_unique],
-                ),
-            )
+        if any(isinstance(s.server, KookitASGIServer) for s in self.services):
+            self.patch_httpx()
 
-            self.process_manager = ProcessManager(
-                server_process,
+        process_managers: dict[object, AbstractContextManager] = {}
+        if not_unique and not self.process_manager:
+            process_managers[self] = self.server.serve(
+                [service.spec() for service in not_unique],
                 startup_timeout=self.startup_timeout,
                 shutdown_timeout=self.shutdown_timeout,
                 parent=f"{self}[{self.server.url}]",
-                wait_func=self.server.wait,
             )
-            self.process_manager.__enter__()
+        for service in self.services:
+            if service.unique_url and not service.active:
+                process_managers[service] = service.spawn()
+
+        logger.trace("{}: starting {} servers", self, len(process_managers))
+        start_all(list(process_managers.values()))
+        self.process_manager = process_managers.pop(self, self.process_manager)
 
         for service in self.services:
-            service.__enter__()
+            service.start(process_managers.get(service))
 
         return self
 
@@ -117,13 +168,28 @@ class HTTPKookit:
         exc: BaseException | None,
         tb: TracebackType | None,
     ) -> None:
-        # 1. stop global service
-        # 2. stop all other services' servers
-        if self.process_manager:
-            self.process_manager.__exit__(typ, exc, tb)
-            self.process_manager = None
-        else:
-            logger.trace(f"{self}: server process already stopped")
+        # 1. stop the global server and all unique services' servers at once
+        # 2. stop the services
+        if not self.process_manager:
+            logger.trace("{}: server process already stopped", self)
+
+        process_managers: list[AbstractContextManager] = [
+            process_manager
+            for process_manager in [
+                self.process_manager,
+                *(service.detach_process() for service in self.services),
+            ]
+            if process_manager
+        ]
+        self.process_manager = None
+        stop_all(process_managers, typ, exc, tb)
 
         for service in self.services:
             service.__exit__(typ, exc, tb)
+
+    def close(self) -> None:
+        for service in self.services:
+            service.close()
+        for server in [self.server, *(s.server for s in self.services if s.unique_url)]:
+            if not self.pool or not self.pool.release(server):
+                server.close()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from bisect import bisect_left
+from math import inf
+from typing import TYPE_CHECKING, Final
+
+from multiprocess.shared_memory import SharedMemory
+from multiprocess.util import Finalize
+
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+__all__ = ["ServiceMetrics"]
+
+
+def release(memory: SharedMemory, slots: memoryview[float], *, unlink: bool) -> None:
+    # the memory can't be closed while the slots view it
+    slots.release()
+    memory.close()
+    if unlink:
+        memory.unlink()
+
+
+class ServiceMetrics:
+    """Request counters of a service, written by the server and read by the test.
+
+    The values live in named shared memory, so they are visible from the test process
+    whether the service is served by a child process, a pooled server or in process.
+    Every worker of a server writes its own shard, which are summed up on reading.
+
+    The histograms grow with the routes of a service by blocks added after the others,
+    as the group states do: no value ever moves, so the metrics a server got before
+    keep counting while routes are added.
+    """
+
+    COUNTERS: Final = (
+        "received",
+        "matched",
+        "unmatched",
+        "matching_seconds",
+        "serving_seconds",
+        "faults",
+    )
+    BUCKETS: Final = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, inf)
+
+    def __init__(
+        self,
+        routes: Sequence[tuple[str, str]] = (),
+        *,
+        shards: int = 1,
+        blocks: Sequence[tuple[str, int, Sequence[tuple[str, str]]]] = (),
+    ) -> None:
+        self.shards: Final = shards
+        self.routes: Final[list[tuple[str, str]]] = []
+        # a block with its slots, the number of slots of a shard and its room for routes
+        self.blocks: Final[list[tuple[SharedMemory, memoryview[float], int, int]]] = []
+        # a route with the slots of its histogram, their shard size and offset in a shard
+        self.route_offsets: Final[dict[tuple[str, str], tuple[memoryview[float], int, int]]] = {}
+        self.finalizers: Final[list[Finalize]] = []
+        self.filled: int = 0
+        for name, room, block_routes in blocks:
+            self.add_block(room, name=name)
+            for route in block_routes:
+                self.place(route)
+        if not self.blocks:
+            self.add_block(len(dict.fromkeys(routes)))
+        # the counters are in the first block
+        self.counters: Final = self.blocks[0][1]
+        self.shard_size: Final = self.blocks[0][2]
+        self.grow(routes)
+
+    def __str__(self) -> str:
+        return f"[ServiceMetrics({', '.join(memory.name for memory, *_ in self.blocks)})]"
+
+    def __getstate__(self) -> dict:
+        blocks: list[tuple[str, int, list[tuple[str, str]]]] = []
+        start: int = 0
+        for memory, _, _, room in self.blocks:
+            blocks.append((memory.name, room, self.routes[start : start + room]))
+            start += room
+        return {"shards": self.shards, "blocks": blocks}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(shards=state["shards"], blocks=state["blocks"])  # type: ignore[misc]
+
+    def add_block(self, room: int, *, name: str | None = None) -> None:
+        shard_size: int = room * len(self.BUCKETS)
+        if not self.blocks:
+            shard_size += len(self.COUNTERS)
+        size: int = 8 * shard_size * self.shards
+        memory = SharedMemory(name, create=name is None, size=size)
+        slots = memory.buf[:size].cast("d")
+        # also released once the metrics are gone, if they're never closed
+        self.finalizers.append(
+            Finalize(
+                self,
+                release,
+                args=(memory, slots),
+                kwargs={"unlink": name is None},
+                exitpriority=0,
+            )
+        )
+        self.blocks.append((memory, slots, shard_size, room))
+        self.filled = 0
+
+    def place(self, route: tuple[str, str]) -> None:
+        _, slots, shard_size, room = self.blocks[-1]
+        offset: int = shard_size - (room - self.filled) * len(self.BUCKETS)
+        self.route_offsets[route] = (slots, shard_size, offset)
+        self.routes.append(route)
+        self.filled += 1
+
+    def grow(self, routes: Sequence[tuple[str, str]]) -> None:
+        """Make room for the histograms of the routes there are no histograms of yet."""
+        new = [route for route in dict.fromkeys(routes) if route not in self.route_offsets]
+        for index, route in enumerate(new):
+            if self.filled == self.blocks[-1][3]:
+                # twice as large at least, so that routes added one by one make few blocks
+                self.add_block(max(len(new) - index, len(self.routes)))
+            self.place(route)
+
+    def total(self, offset: int) -> float:
+        return sum(self.counters[shard * self.shard_size + offset] for shard in range(self.shards))
+
+    def observe(
+        self,
+        route: tuple[str, str] | None,
+        *,
+        matching: float,
+        serving: float,
+        fault: bool = False,
+        shard: int = 0,
+    ) -> None:
+        counters = self.counters
+        base: int = shard * self.shard_size
+        counters[base] += 1
+        if route is None:
+            counters[base + 2] += 1
+        elif fault:
+            # matched, but served no response of the route
+            counters[base + 1] += 1
+            counters[base + 5] += 1
+        else:
+            counters[base + 1] += 1
+            slots, shard_size, offset = self.route_offsets[route]
+            slots[shard * shard_size + offset + bisect_left(self.BUCKETS, serving)] += 1
+        counters[base + 3] += matching
+        counters[base + 4] += serving
+
+    @property
+    def received(self) -> int:
+        return int(self.total(0))
+
+    @property
+    def matched(self) -> int:
+        return int(self.total(1))
+
+    @property
+    def unmatched(self) -> int:
+        return int(self.total(2))
+
+    @property
+    def matching_seconds(self) -> float:
+        return self.total(3)
+
+    @property
+    def serving_seconds(self) -> float:
+        return self.total(4)
+
+    @property
+    def faults(self) -> int:
+        """The number of matched requests with a fault injected instead of their response."""
+        return int(self.total(5))
+
+    def histogram(self, method: str, path: str) -> dict[float, int]:
+        """Return serving latencies of a route: bucket upper bound => number of requests."""
+        slots, shard_size, offset = self.route_offsets[(method, path)]
+        return {
+            bound: int(
+                sum(slots[shard * shard_size + offset + index] for shard in range(self.shards))
+            )
+            for index, bound in enumerate(self.BUCKETS)
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            **{counter: getattr(self, counter) for counter in self.COUNTERS},
+            "routes": {
+                f"{method} {path}": self.histogram(method, path) for method, path in self.routes
+            },
+        }
+
+    def close(self) -> None:
+        for finalizer in self.finalizers:
+            finalizer()
@@ -1,5 +1,7 @@
+from .file_response import KookitFileResponse
 from .json_request import KookitJSONRequest
 from .json_response import KookitJSONResponse
 from .request import KookitHTTPRequest
 from .response import KookitHTTPResponse
+from .streaming_response import KookitStreamingResponse
 from .xml_response import KookitXMLResponse
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import mimetypes
+import mmap
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Mapping
+
+from starlette.datastructures import Headers
+
+from .response import KookitHTTPResponse
+
+
+if TYPE_CHECKING:
+    import os
+
+    from starlette.types import Scope, Send
+
+
+def requested_range(value: str, size: int) -> tuple[int, int] | None:
+    """Return [start, end) of a single byte range or None if it's not satisfiable.
+
+    Raise ValueError for ranges that should be ignored (malformed or multiple ones).
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        msg = f"unsupported range: {value}"
+        raise ValueError(msg)
+
+    first, _, last = spec.strip().partition("-")
+    if not first:
+        suffix = int(last)
+        return (max(size - suffix, 0), size) if suffix and size else None
+
+    start: int = int(first)
+    end: int = min(int(last) + 1, size) if last else size
+    if start >= size or end <= start:
+        return None
+    return start, end
+
+
+class FileBody:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        offset: int = 0,
+        length: int | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        self.path: Final = path
+        self.offset: Final = offset
+        self.length: Final = length
+        self.chunk_size: Final = chunk_size
+
+    def size(self) -> int:
+        available: int = max(self.path.stat().st_size - self.offset, 0)
+        return available if self.length is None else min(self.length, available)
+
+    async def respond(self, scope: Scope, start: dict, send: Send) -> None:
+        size: int = self.size()
+        status: int = start["status"]
+        first, last = 0, size
+        headers: list[tuple[bytes, bytes]] = [*start["headers"], (b"accept-ranges", b"bytes")]
+
+        range_header: str | None = Headers(scope=scope).get("range")
+        if range_header and status == 200:  # noqa: PLR2004
+            try:
+                byte_range = requested_range(range_header, size)
+            except ValueError:
+                byte_range = (first, last)
+            else:
+                if byte_range is None:
+                    headers.append((b"content-range", f"bytes */{size}".encode("latin-1")))
+                    headers.append((b"content-length", b"0"))
+                    await send({**start, "status": 416, "headers": headers})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                status = 206
+                headers.append(
+                    (
+                        b"content-range",
+                        f"bytes {byte_range[0]}-{byte_range[1] - 1}/{size}".encode("latin-1"),
+                    )
+                )
+            first, last = byte_range
+
+        headers.append((b"content-length", str(last - first).encode("latin-1")))
+        await send({**start, "status": status, "headers": headers})
+        await self.send_bytes(scope, send, self.offset + first, last - first)
+
+    async def send_bytes(self, scope: Scope, send: Send, offset: int, count: int) -> None:
+        if not count:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with self.path.open("rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file.fileno(),
+                        "offset": offset,
+                        "count": count,
+                    }
+                )
+                return
+
+            # only the chunk being sent is ever copied out of the page cache
+            aligned: int = offset - offset % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(
+                file.fileno(), offset + count - aligned, access=mmap.ACCESS_READ, offset=aligned
+            ) as mapped:
+                position: int = offset - aligned
+                end: int = position + count
+                while position < end:
+                    chunk_end: int = min(position + self.chunk_size, end)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": mapped[position:chunk_end],
+                            "more_body": chunk_end < end,
+                        }
+                    )
+                    position = chunk_end
+
+
+class KookitFileResponse(KookitHTTPResponse):
+    """A response with a body served from a file (or its byte range) as is.
+
+    The file is neither read nor pickled up front, it's memory mapped (or sent
+    with zero-copy send when the server supports it) on every request.
+    Single byte range requests are supported.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        url: str = "/",
+        method: str = "GET",
+        status_code: int = 200,
+        headers: Mapping | None = None,
+        offset: int = 0,
+        length: int | None = None,
+        chunk_size: int = 64 * 1024,
+        **request_matchers: Any,
+    ) -> None:
+        path = Path(path)
+        headers = dict(headers or {})
+        if not any(key.lower() == "content-type" for key in headers):
+            headers["content-type"] = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        super().__init__(
+            status_code=status_code,
+            method=method,
+            headers=headers,
+            url=url,
+            **request_matchers,
+        )
+        self.body_source = FileBody(path, offset=offset, length=length, chunk_size=chunk_size)
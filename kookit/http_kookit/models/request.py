@@ -23,6 +23,17 @@ class IKookitService(Protocol):
     def url(self) -> str: ...
 
 
+class ServiceAddress:
+    """All a server needs of the service a follow-up request is sent to."""
+
+    def __init__(self, name: str, url: str) -> None:
+        self.name: Final = name
+        self.url: Final = url
+
+    def __str__(self) -> str:
+        return self.name
+
+
 class KookitHTTPRequest:
     def __init__(
         self,
@@ -55,6 +66,9 @@ class KookitHTTPRequest:
         self.headers: Mapping[str, str] = request.headers
         self.request_delay: Final[float] = request_delay
 
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "service": ServiceAddress(str(self.service), self.service.url)}
+
     def __str__(self) -> str:
         return f"<Request({self.service}, '{self.method}', '{self.url}')>"
 
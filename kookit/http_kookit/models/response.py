@@ -18,6 +18,9 @@ if TYPE_CHECKING:
         RequestFiles,
     )
 
+    from kookit.http_kookit.faults import Faults
+    from kookit.http_kookit.interfaces import IBodySource
+
 
 @dataclass
 class KookitResponseRequest:
@@ -48,6 +51,7 @@ class KookitHTTPResponse:
         request_data: RequestData | None = None,
         request_files: RequestFiles | None = None,
         request_json: Any | None = None,
+        faults: Faults | None = None,
     ) -> None:
         request = Request(
             url=url,
@@ -83,6 +87,8 @@ class KookitHTTPResponse:
         self.content: Final[bytes] = response.content
         self.headers: Final[Mapping[str, str]] = response.headers
         self.status_code: Final[int] = response.status_code
+        self.body_source: IBodySource | None = None
+        self.faults: Final = faults
 
     def __str__(self) -> str:
         return f"<Response({self.status_code}, '{self.request.method}', '{self.request.url}')>"
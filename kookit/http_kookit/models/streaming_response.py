@@ -0,0 +1,109 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterable, Callable, Final, Iterable, Mapping, Union
+
+from starlette.concurrency import iterate_in_threadpool
+
+from .response import KookitHTTPResponse
+
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from starlette.types import Scope, Send
+
+
+IChunks = Callable[[], Union[Iterable[bytes], AsyncIterable[bytes]]]
+
+
+class ResponseStream:
+    def __init__(
+        self,
+        chunks: IChunks,
+        *,
+        chunk_size: int | None = None,
+        chunk_delay: float = 0,
+        bytes_per_second: float | None = None,
+    ) -> None:
+        self.chunks: Final = chunks
+        self.chunk_size: Final = chunk_size
+        self.chunk_delay: Final = chunk_delay
+        self.bytes_per_second: Final = bytes_per_second
+
+    async def iterate(self) -> AsyncIterator[bytes]:
+        chunks = self.chunks()
+        if isinstance(chunks, AsyncIterable):
+            async for chunk in chunks:
+                yield chunk
+        else:
+            async for chunk in iterate_in_threadpool(iter(chunks)):
+                yield chunk
+
+    async def rechunk(self) -> AsyncIterator[bytes]:
+        if not self.chunk_size:
+            async for chunk in self.iterate():
+                if chunk:
+                    yield chunk
+            return
+
+        buffer = bytearray()
+        async for chunk in self.iterate():
+            buffer += chunk
+            while len(buffer) >= self.chunk_size:
+                yield bytes(buffer[: self.chunk_size])
+                del buffer[: self.chunk_size]
+        if buffer:
+            yield bytes(buffer)
+
+    async def respond(self, scope: Scope, start: dict, send: Send) -> None:  # noqa: ARG002
+        await send(start)
+
+        started_at: float = time.perf_counter()
+        sent: int = 0
+        async for chunk in self.rechunk():
+            if sent and self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            if self.bytes_per_second:
+                # never get ahead of the bandwidth, including the chunk being sent
+                ahead: float = (sent + len(chunk)) / self.bytes_per_second
+                await asyncio.sleep(max(started_at + ahead - time.perf_counter(), 0))
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            sent += len(chunk)
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class KookitStreamingResponse(KookitHTTPResponse):
+    """A response with a body produced on the fly and sent with chunked transfer encoding.
+
+    `chunks` is a (sync or async) generator function, called for every served request,
+    so the body is never held in memory nor pickled into the server process.
+    """
+
+    def __init__(
+        self,
+        chunks: IChunks,
+        *,
+        url: str = "/",
+        method: str = "GET",
+        status_code: int = 200,
+        headers: Mapping | None = None,
+        chunk_size: int | None = None,
+        chunk_delay: float = 0,
+        bytes_per_second: float | None = None,
+        **request_matchers: Any,
+    ) -> None:
+        super().__init__(
+            status_code=status_code,
+            method=method,
+            headers=headers,
+            url=url,
+            **request_matchers,
+        )
+        self.body_source = ResponseStream(
+            chunks,
+            chunk_size=chunk_size,
+            chunk_delay=chunk_delay,
+            bytes_per_second=bytes_per_second,
+        )
@@ -0,0 +1,185 @@
+from __future__ import annotations
+import os
+from typing import TYPE_CHECKING, Any, Final, Mapping, Sequence
+
+from typing_extensions import Self
+
+from kookit.logging import logger
+from kookit.utils import ProcessGroup, ProcessManager
+from .server import KookitHTTPServer
+
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .interfaces import IServer, IService
+
+
+__all__ = ["KookitHTTPServerPool"]
+
+
+class ServicesLease:
+    def __init__(
+        self,
+        server: KookitPooledHTTPServer,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> None:
+        self.server: Final = server
+        self.services: Final = services
+        self.startup_timeout: Final = startup_timeout
+        self.shutdown_timeout: Final = shutdown_timeout
+        self.parent: Final = parent
+
+    def __repr__(self) -> str:
+        return self.parent
+
+    def start(self) -> None:
+        logger.trace("{}: loading {} services", self, len(self.services))
+        self.server.send_command("load", self.services)
+
+    def wait(self) -> None:
+        self.server.command_result("load", timeout=self.startup_timeout)
+
+    def __enter__(self) -> Self:
+        self.start()
+        self.wait()
+        return self
+
+    def __exit__(
+        self,
+        typ: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        logger.trace("{}: unloading services", self)
+        try:
+            self.server.command("unload", timeout=self.shutdown_timeout)
+            if logger.buffer is not None:
+                logger.keep(self.server.command("logs", timeout=self.shutdown_timeout))
+        except RuntimeError as exc:
+            logger.trace("{}: {}. Stopping server process.", self, exc)
+            self.server.stop()
+
+
+class KookitPooledHTTPServer(KookitHTTPServer):
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        start_method: str | None = None,
+        environ: Mapping[str, str] | None = None,
+    ) -> None:
+        super().__init__(host=host, start_method=start_method)
+        # outlives the test starting it, so it runs with the environment of the pool instead
+        self.environ: Final = dict(os.environ if environ is None else environ)
+        self.process_manager: ProcessManager | ProcessGroup | None = None
+
+    def __str__(self) -> str:
+        return f"[KookitPooledHTTPServer({self.port})]"
+
+    def __getstate__(self) -> dict:
+        return {**super().__getstate__(), "environ": self.environ}
+
+    def run(self, *args: Any, **kwargs: Any) -> None:
+        os.environ.clear()
+        os.environ.update(self.environ)
+        super().run(*args, **kwargs)
+
+    @property
+    def is_alive(self) -> bool:
+        return bool(self.process_manager and self.process_manager.is_alive())
+
+    def start(self, *, startup_timeout: float, shutdown_timeout: float) -> None:
+        self.process_manager = self.spawn(
+            [],
+            startup_timeout=startup_timeout,
+            shutdown_timeout=shutdown_timeout,
+            parent=f"{self}[{self.url}]",
+        )
+        self.process_manager.__enter__()
+
+    def stop(self) -> None:
+        if self.process_manager:
+            self.process_manager.__exit__(None, None, None)
+            self.process_manager = None
+
+    def serve(
+        self,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> ServicesLease:
+        return ServicesLease(
+            self,
+            services,
+            startup_timeout=startup_timeout,
+            shutdown_timeout=shutdown_timeout,
+            parent=parent,
+        )
+
+
+class KookitHTTPServerPool:
+    def __init__(
+        self,
+        *,
+        startup_timeout: float = ProcessManager.DEFAULT_STARTUP_TIMEOUT,
+        shutdown_timeout: float = ProcessManager.DEFAULT_SHUTDOWN_TIMEOUT,
+        start_method: str | None = None,
+    ) -> None:
+        self.startup_timeout: Final = startup_timeout
+        self.shutdown_timeout: Final = shutdown_timeout
+        self.start_method: Final = start_method
+        # taken before tests patch it, for servers started within a test
+        self.environ: Final = dict(os.environ)
+        self.servers: Final[list[KookitPooledHTTPServer]] = []
+        self.idle: Final[list[KookitPooledHTTPServer]] = []
+
+    def __str__(self) -> str:
+        return "[KookitHTTPServerPool]"
+
+    def start(self, servers: int = 1) -> None:
+        """Start idle servers ahead of the tests, e.g. before any of them patches anything."""
+        for _ in range(servers):
+            self.idle.append(self.new_server())
+
+    def new_server(self) -> KookitPooledHTTPServer:
+        server = KookitPooledHTTPServer(start_method=self.start_method, environ=self.environ)
+        logger.trace("{}: starting {}", self, server)
+        server.start(
+            startup_timeout=self.startup_timeout,
+            shutdown_timeout=self.shutdown_timeout,
+        )
+        self.servers.append(server)
+        return server
+
+    def acquire(self) -> KookitPooledHTTPServer:
+        if self.idle:
+            server = self.idle.pop()
+            logger.trace("{}: reusing {}", self, server)
+            return server
+        return self.new_server()
+
+    def release(self, server: IServer) -> bool:
+        if not isinstance(server, KookitPooledHTTPServer) or server not in self.servers:
+            return False
+        if server.is_alive:
+            self.idle.append(server)
+            return True
+        logger.trace("{}: {} is dead. Dropping.", self, server)
+        self.servers.remove(server)
+        server.stop()
+        server.close()
+        return True
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.stop()
+            server.close()
+        self.servers.clear()
+        self.idle.clear()
@@ -1,16 +1,25 @@
 from __future__ import annotations
+import asyncio
 import time
+from hashlib import sha256
 from typing import TYPE_CHECKING, Any, Final
 
 from httpx import URL, Client
-from multiprocess import Value
 from typing_extensions import Self
 
 from kookit.logging import logger
+from .body import BodyDigest
+from .states import GroupStates
 
 
 if TYPE_CHECKING:
-    from .interfaces import IRequest
+    from collections.abc import Set as AbstractSet
+
+    from starlette.types import Scope, Send
+
+    from .faults import Faults
+    from .follow_ups import FollowUpRunner
+    from .interfaces import IBodySource, IRequest
     from .models import KookitHTTPRequest, KookitHTTPResponse
 
 
@@ -19,15 +28,99 @@ class ResponseGroup:
         self,
         response: KookitHTTPResponse | None = None,
         parent: Any = "",
+        *,
+        states: GroupStates | None = None,
+        index: int = 0,
     ) -> None:
         self._parent: Final = parent
         self._response: Final = response
         self._requests: list[KookitHTTPRequest] = []
-        self._active: Value = Value("i", 1)
+        # the state of the group is a byte of the states shared by the groups of a service
+        self._states: Final = states if states is not None else GroupStates(1)
+        self._index: Final = index
+
+        # what a server needs of the response, which itself stays in the test process
+        request = response.request if response else None
+        self.responds: Final[bool] = response is not None
+        self.method: Final[str] = request.method if request else ""
+        self.path: Final[str] = request.url.path if request else ""
+        self.query: Final[bytes] = request.url.query if request else b""
+        self._url: Final[str] = str(request.url) if request else ""
+        self.body: Final[BodyDigest | None] = (
+            BodyDigest(request.content) if request and request.content else None
+        )
+        self._headers: Final[frozenset[tuple[str, str]]] = frozenset(
+            request.headers.items() if request and request.headers else ()
+        )
+        self._query: Final[str] = self.query.decode("ascii")
+        self._messages: Final[tuple[dict, dict]] = self.encode(response) if response else ({}, {})
+        self._body_source: Final[IBodySource | None] = response.body_source if response else None
+        self._faults: Final[Faults | None] = response.faults if response else None
+
+    @staticmethod
+    def encode(response: KookitHTTPResponse) -> tuple[dict, dict]:
+        headers: list[tuple[bytes, bytes]] = [
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+            for key, value in response.headers.items()
+        ]
+        if not response.body_source and not any(key == b"content-length" for key, _ in headers):
+            headers.append((b"content-length", str(len(response.content)).encode("latin-1")))
+        return ResponseGroup.messages(response.status_code, headers, response.content)
+
+    @staticmethod
+    def messages(
+        status: int, headers: list[tuple[bytes, bytes]], body: bytes
+    ) -> tuple[dict, dict]:
+        return (
+            {"type": "http.response.start", "status": status, "headers": headers},
+            {"type": "http.response.body", "body": body},
+        )
+
+    async def respond(self, scope: Scope, send: Send) -> None:
+        start, body = self._messages
+        if self._body_source:
+            await self._body_source.respond(scope, start, send)
+            return
+        await send(start)
+        await send(body)
+
+    @property
+    def states(self) -> GroupStates:
+        return self._states
 
     @property
     def active(self) -> bool:
-        return bool(self._active.value)
+        return self._states.active(self._index)
+
+    @property
+    def available(self) -> bool:
+        """Whether the group may be matched: it's active and not claimed by a request."""
+        return self._states.available(self._index)
+
+    def deactivate(self) -> None:
+        self._states.deactivate(self._index)
+
+    def claim(self) -> bool:
+        """Reserve the group for a request, unless another request has done it already."""
+        return self._states.claim(self._index)
+
+    def release(self) -> None:
+        """Give the group back, e.g. when it's claimed by a request that has failed."""
+        self._states.release(self._index)
+
+    def __getstate__(self) -> dict:
+        start, body = self._messages
+        return {
+            **self.__dict__,
+            "_parent": str(self._parent),
+            "_response": None,
+            # the messages are made again out of what they hold
+            "_messages": (start["status"], start["headers"], body["body"]) if start else None,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        messages: tuple | None = state["_messages"]
+        self.__dict__.update(state, _messages=self.messages(*messages) if messages else ({}, {}))
 
     def __repr__(self) -> str:
         return str(self)
@@ -40,8 +133,13 @@ class ResponseGroup:
 
     @property
     def response(self) -> KookitHTTPResponse | None:
+        """The response model, in the test process only: servers get the group compiled."""
         return self._response
 
+    @property
+    def faults(self) -> Faults | None:
+        return self._faults
+
     @property
     def request(self) -> Any | None:
         if not self._response:
@@ -50,82 +148,84 @@ class ResponseGroup:
 
     @property
     def url(self) -> URL | None:
-        if not self.response:
-            return None
-        return self.response.request.url
-
-    @property
-    def method(self) -> str:
-        if not self.response:
-            return ""
-        return self.response.request.method
-
-    @property
-    def path(self) -> str:
-        if not self.response:
-            return ""
-        return self.response.request.url.path
-
-    @property
-    def query(self) -> bytes:
-        if not self.response:
-            return b""
-        return self.response.request.url.query
+        return URL(self._url) if self.responds else None
 
     # ruff: noqa: PLR0911
     def __eq__(self, request: IRequest) -> bool:  # type: ignore[override]
-        if not self.response or not self.active:
+        if not self.responds or not self.available:
             return False
 
         if self.method != request.method:
-            logger.trace(f"{self}: expected method: {self.method}, got: {request.method}")
+            logger.trace("{}: expected method: {}, got: {}", self, self.method, request.method)
             return False
 
         try:
             expected_url_path = self.path.format(**request.path_params)
         except KeyError:
             logger.trace(
-                f"{self}: Incomparable url path. Expected url path: {self.path}, "
-                f"got: {request.url.path}",
+                "{}: Incomparable url path. Expected url path: {}, got: {}",
+                self,
+                self.path,
+                request.url.path,
             )
             return False
 
         if expected_url_path != request.url.path:
             logger.trace(
-                f"{self}: Expected url path: {expected_url_path}, got: {request.url.path}",
+                "{}: Expected url path: {}, got: {}", self, expected_url_path, request.url.path
             )
             return False
 
-        req = self.response.request
-
-        if req.content and req.content != request.content:
-            logger.trace(f"{self}: Expected body: '{req.content!r}', got: '{request.content!r}'")
+        if self.body and not self.body.matches(
+            len(request.content), sha256(request.content).digest()
+        ):
+            logger.trace(
+                "{}: Expected body of {} bytes, got: '{!r}'",
+                self,
+                self.body.length,
+                request.content,
+            )
             return False
 
-        if req.headers and not all(it in request.headers.items() for it in req.headers.items()):
+        if not self._headers <= frozenset(request.headers.items()):
             logger.trace(
-                f"{self}: Expected headers: {dict(req.headers)}, got: {dict(request.headers)}",
+                "{}: Expected headers: {}, got: {}", self, dict(self._headers), request.headers
             )
             return False
 
         if self.query and self.query.decode("ascii") != request.url.query:
             logger.trace(
-                f"{self}: Expected query params: '{self.query!r}', got: '{request.url.query!r}'",
+                "{}: Expected query params: '{!r}', got: '{!r}'",
+                self,
+                self.query,
+                request.url.query,
             )
             return False
 
-        logger.trace(f"{self}: request {request} matched")
+        logger.trace("{}: request {} matched", self, request)
         return True
 
+    def matches(self, request: IRequest, headers: AbstractSet[tuple[str, str]]) -> bool:
+        """Match anything but the body, which is matched against `body` while streamed."""
+        return (
+            self.available
+            and self._headers <= headers
+            and (not self._query or self._query == request.url.query)
+        )
+
     def __enter__(self) -> Self:
         return self
 
     def __exit__(self, *_args: object) -> None:
-        logger.trace(f"{self}: running {len(self._requests)} requests")
+        logger.trace("{}: running {} requests", self, len(self._requests))
         for req in self._requests:
             logger.debug(
-                f"{self}: running request <{req.method} {req.url}> ({req.service.url=}, "
-                f"{req.request_delay=}))",
+                "{}: running request <{} {}> (req.service.url={!r}, req.request_delay={!r})",
+                self,
+                req.method,
+                req.url,
+                req.service.url,
+                req.request_delay,
             )
             time.sleep(req.request_delay)
             with Client(base_url=req.service.url) as client:
@@ -138,9 +238,41 @@ class ResponseGroup:
                 )
 
                 logger.trace(
-                    f"{self}: request <{req.method} {req.url}> "
-                    f"successfully executed ==> {response}",
+                    "{}: request <{} {}> successfully executed ==> {}",
+                    self,
+                    req.method,
+                    req.url,
+                    response,
                 )
 
-        with self._active.get_lock():
-            self._active.value = 0
+        self.deactivate()
+
+    async def run_requests(self, runner: FollowUpRunner) -> None:
+        logger.trace("{}: running {} requests", self, len(self._requests))
+        for req in self._requests:
+            logger.debug(
+                "{}: running request <{} {}> (req.service.url={!r}, req.request_delay={!r})",
+                self,
+                req.method,
+                req.url,
+                req.service.url,
+                req.request_delay,
+            )
+            if req.request_delay:
+                await asyncio.sleep(req.request_delay)
+            response = await runner.client(req.service.url).request(
+                method=req.method,
+                url=req.url,
+                content=req.content,
+                headers=req.headers,
+            )
+
+            logger.trace(
+                "{}: request <{} {}> successfully executed ==> {}",
+                self,
+                req.method,
+                req.url,
+                response,
+            )
+
+        self.deactivate()
@@ -1,63 +1,322 @@
 from __future__ import annotations
-import queue
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import TYPE_CHECKING, Any, Final
 
 import uvicorn
-from fastapi import APIRouter, FastAPI
-from multiprocess import Queue
+from fastapi import FastAPI
+from fastapi.middleware import Middleware
+from multiprocess import Pipe, forkserver, get_context, resource_tracker
+from multiprocess.util import Finalize
 
 from kookit.logging import logger
-from kookit.utils import ILifespan, Lifespans
+from kookit.utils import ProcessGroup, ProcessManager, bind_port, listening_socket
+from .faults import quiet_injected_faults
+from .follow_ups import FollowUpRunner
+from .journal import JournalMiddleware
 
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Callable, Iterable
+    import socket
+    from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+    from contextlib import AbstractContextManager
+
+    from fastapi import APIRouter
+    from multiprocess.connection import Connection
+    from multiprocess.context import BaseContext
+    from starlette.routing import BaseRoute
+
+    from .interfaces import IService
+
+
+def endpoints(routes: Iterable[BaseRoute]) -> Iterator[Any]:
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None:
+            yield endpoint
+        # routers included into others, by copy or by reference (recent FastAPI)
+        router = getattr(route, "original_router", route)
+        yield from endpoints(getattr(router, "routes", ()))
+
+
+class ServicesLoader:
+    def __init__(self, app: FastAPI, *, worker: int = 0) -> None:
+        self.app: Final = app
+        self.base_routes: Final = list(app.router.routes)
+        self.services: list[IService] = []
+        self.exit_stack: AsyncExitStack | None = None
+        self.follow_up_runner: Final = FollowUpRunner()
+        app.state.follow_up_runner = self.follow_up_runner
+        app.state.worker = worker
+        # see JournalMiddleware
+        app.state.journals = []
+        app.state.route_journals = {}
+
+    async def load(self, services: Sequence[IService]) -> None:
+        await self.unload()
+        exit_stack = AsyncExitStack()
+        async with exit_stack:
+            for service in services:
+                await exit_stack.enter_async_context(service.lifespan(self.app))
+            self.route(services)
+            self.services = list(services)
+            self.exit_stack = exit_stack.pop_all()
+
+    def route(self, services: Sequence[IService]) -> None:
+        routers: list[APIRouter] = [service.router() for service in services]
+        self.app.router.routes[:] = self.base_routes
+        try:
+            for router in routers:
+                self.app.include_router(router)
+        except Exception:
+            self.app.router.routes[:] = self.base_routes
+            raise
+        self.app.state.journals = [service.journal for service in services]
+        # routes may be copied when included, their endpoints are not
+        self.app.state.route_journals = {
+            id(endpoint): service.journal
+            for service, router in zip(services, routers)
+            for endpoint in endpoints(router.routes)
+        }
+
+    def find(self, key: str) -> int:
+        for index, service in enumerate(self.services):
+            if service.key == key:
+                return index
+        msg = f"service {key} is not loaded"
+        raise LookupError(msg)
+
+    async def update(self, service: IService) -> None:
+        index: int = self.find(service.key)
+        services: list[IService] = [*self.services]
+        services[index] = service
+        self.route(services)
+        self.services = services
+
+    async def logs(self) -> list[tuple[float, str, str, tuple]]:
+        """Return the log records buffered by the server process since the last call."""
+        return logger.export()
+
+    async def detach(self) -> None:
+        self.app.router.routes[:] = self.base_routes
+        self.app.state.journals = []
+        self.app.state.route_journals = {}
+        self.services = []
+
+    async def unload(self) -> None:
+        await self.detach()
+        await self.follow_up_runner.aclose()
+        if self.exit_stack:
+            exit_stack, self.exit_stack = self.exit_stack, None
+            await exit_stack.aclose()
+
+
+class ReadyServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, ready: Connection) -> None:
+        super().__init__(config)
+        self.ready: Final = ready
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets)
+        # the sockets are listening here (or startup has failed)
+        self.ready.send(self.started)
+
+
+def server_context(start_method: str | None) -> BaseContext:
+    if start_method != "forkserver":
+        return get_context(start_method)
+    # the fork server is the zygote of servers: it has the server stack imported and frozen
+    context: BaseContext = get_context(start_method)
+    context.set_forkserver_preload(["kookit.http_kookit.zygote"])
+    forkserver.ensure_running()
+    return context
 
 
 class KookitHTTPServer:
-    def __init__(self, port: int, *, host: str = "127.0.0.1") -> None:
-        self.queue: Final = Queue()
+    """Uvicorn in a child process, or in several worker processes sharing the port.
+
+    Workers accept connections on their own sockets bound to the port with SO_REUSEPORT
+    (or on the inherited bound socket without it), and every worker enters the lifespans.
+    Response groups states are in shared memory, so they are shared between the workers
+    and the test process, also for services updated on a running server.
+    Processes are started with the given start method, services are passed as specs.
+    With the forkserver method, processes are forked from a zygote, see zygote.py.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        workers: int = 1,
+        start_method: str | None = None,
+    ) -> None:
+        if workers < 1:
+            msg = f"a server needs at least one worker, got {workers}"
+            raise ValueError(msg)
+        self.workers: Final = workers
+        self.context: Final = server_context(start_method)
+        self.ready_pipes: Final = [Pipe(duplex=False) for _ in range(workers)]
+        self.command_pipes: Final = [Pipe() for _ in range(workers)]
+        self.socket: Final = bind_port(host)
         self.host: Final[str] = host
-        self.port: Final[int] = port
-        self.url: Final[str] = f"http://{host}:{port}"
+        self.port: Final[int] = self.socket.getsockname()[1]
+        # the port is released once the server is gone, if it's never closed
+        Finalize(self, self.socket.close, exitpriority=0)
+        self.url: Final[str] = f"http://{host}:{self.port}"
+        self.inside: bool = False
 
     def __str__(self) -> str:
         return "[KookitHTTPServer]"
 
-    def wait(self, timeout: float | None = None) -> Any:
-        try:
-            return self.queue.get(timeout=timeout)
-        except queue.Empty:
-            return False
+    def __getstate__(self) -> dict:
+        # Only an address is meaningful outside of the process that owns the server
+        return {
+            "host": self.host,
+            "port": self.port,
+            "url": self.url,
+            "workers": self.workers,
+            "inside": True,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def spawn(
+        self,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> ProcessManager | ProcessGroup:
+        # the server shares the tracker, so it never unlinks the services' shared memory
+        resource_tracker.ensure_running()
+        managers: list[ProcessManager] = [
+            ProcessManager(
+                self.context.Process(
+                    target=self.run,
+                    args=(services, worker, server_ready, self.command_pipes[worker][1]),
+                    kwargs={"sock": self.socket, "log_settings": logger.settings()},
+                ),
+                startup_timeout=startup_timeout,
+                shutdown_timeout=shutdown_timeout,
+                parent=parent if self.workers == 1 else f"{parent}[worker {worker}]",
+                ready=ready,
+            )
+            for worker, (ready, server_ready) in enumerate(self.ready_pipes)
+        ]
+        if len(managers) == 1:
+            return managers[0]
+        return ProcessGroup(managers, parent=parent)
+
+    def serve(
+        self,
+        services: Sequence[IService],
+        *,
+        startup_timeout: float,
+        shutdown_timeout: float,
+        parent: Any,
+    ) -> AbstractContextManager:
+        return self.spawn(
+            services,
+            startup_timeout=startup_timeout,
+            shutdown_timeout=shutdown_timeout,
+            parent=parent,
+        )
+
+    def command(self, name: str, *args: Any, timeout: float) -> Any:
+        self.send_command(name, *args)
+        return self.command_result(name, timeout=timeout)
+
+    def send_command(self, name: str, *args: Any) -> None:
+        for connection, _ in self.command_pipes:
+            connection.send((name, *args))
+
+    def command_result(self, name: str, *, timeout: float) -> Any:
+        # every worker is waited for, so that no late result is left in a pipe
+        deadline: float = time.perf_counter() + timeout
+        results: list[Any] = []
+        errors: list[str] = []
+        for connection, _ in self.command_pipes:
+            if not connection.poll(max(deadline - time.perf_counter(), 0)):
+                errors.append(f"not handled in {timeout} seconds")
+                continue
+            is_ok, result = connection.recv()
+            if is_ok:
+                results.append(result)
+            else:
+                errors.append(f"failed: {result}")
+
+        if errors:
+            msg = f"{self}: command '{name}' {'; '.join(errors)}"
+            raise RuntimeError(msg)
+        return results[0]
+
+    def update(self, service: IService, *, timeout: float) -> None:
+        if self.inside:
+            # e.g. from a lifespan: the server routes its services once lifespans are entered
+            return
+        self.command("update", service, timeout=timeout)
 
     def run(
         self,
-        routers: Iterable[Callable[[], APIRouter]],
-        lifespans: Iterable[ILifespan],
+        services: Iterable[IService],
+        worker: int,
+        ready: Connection,
+        commands: Connection,
+        *,
+        sock: socket.socket,
+        log_settings: dict[str, Any],
     ) -> None:
-        @asynccontextmanager
-        # ruff: noqa: ARG001
-        async def notify_lifespan(app: FastAPI) -> AsyncIterator:
-            # ruff: noqa: FBT003
-            self.queue.put(True)
-            yield
-            self.queue.put(False)
+        # the server may be unpickled here, so it gets its pipes and socket as arguments
+        self.inside = True
+        logger.configure(**log_settings)
 
         @asynccontextmanager
-        async def routers_lifespan(app: FastAPI) -> AsyncIterator:
-            for router in routers:
-                app.include_router(router())
+        async def server_lifespan(app: FastAPI) -> AsyncIterator:
+            loader = ServicesLoader(app, worker=worker)
+            await loader.load(list(services))
+            self.listen_commands(commands, loader)
             yield
+            await loader.unload()
+            if logger.buffer is not None:
+                # kept by the process manager (uvicorn exits on the signal it has handled)
+                ready.send(logger.export())
 
         app: FastAPI = FastAPI(
-            lifespan=Lifespans(
-                *lifespans,
-                routers_lifespan,
-                notify_lifespan,
-            ),
+            lifespan=server_lifespan, middleware=[Middleware(JournalMiddleware)]
         )
 
-        logger.trace(f"{self}: running uvicorn on port {self.port}")
+        logger.trace("{}: running uvicorn on port {} (worker {})", self, self.port, worker)
+
+        server = ReadyServer(uvicorn.Config(app, host=self.host, port=self.port), ready)
+        # uvicorn drops the connection of a failing response, which is all a fault is after
+        logging.getLogger("uvicorn.error").addFilter(quiet_injected_faults)
+        server.run(sockets=[listening_socket(sock)])
+
+    def listen_commands(self, connection: Connection, loader: ServicesLoader) -> None:
+        loop = asyncio.get_running_loop()
+        tasks: set[asyncio.Task] = set()
+
+        async def handle(name: str, *args: Any) -> None:
+            try:
+                result = await getattr(loader, name)(*args)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("{}: command '{}' failed: {!r}", self, name, exc)
+                connection.send((False, repr(exc)))
+            else:
+                connection.send((True, result))
+
+        def on_command() -> None:
+            name, *args = connection.recv()
+            logger.trace("{}: got command '{}'", self, name)
+            task = loop.create_task(handle(name, *args))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
 
-        uvicorn.run(app, host=self.host, port=self.port)
+        loop.add_reader(connection.fileno(), on_command)
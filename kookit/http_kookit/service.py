@@ -1,25 +1,31 @@
 from __future__ import annotations
 from contextlib import ExitStack
 from itertools import groupby
-from threading import Thread
-from types import SimpleNamespace, TracebackType
 from typing import TYPE_CHECKING, Any, Final
+from uuid import uuid4
 
-from fastapi import APIRouter, Request, Response
-from fastapi.responses import JSONResponse
-from multiprocess import Process
 from typing_extensions import Self
 
 from kookit.logging import logger
 from kookit.utils import ILifespan, Lifespans, ProcessManager
+from .journal import RequestJournal
+from .metrics import ServiceMetrics
 from .models import KookitHTTPRequest, KookitHTTPResponse
 from .response_group import ResponseGroup
+from .spec import ServiceSpec
+from .states import GroupStates
 
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Sequence
+    from contextlib import AbstractContextManager
+    from types import TracebackType
 
+    from fastapi import APIRouter
+
+    from .faults import Faults
     from .interfaces import IServer
+    from .journal import Call
 
 
 class KookitHTTPService:
@@ -33,26 +39,39 @@ class KookitHTTPService:
         unique_url: bool = False,
         name: str = "",
         one_off: bool = True,
+        faults: Faults | None = None,
+        journal_capacity: int = RequestJournal.CAPACITY,
     ) -> None:
         self.server: Final = server
         self.actions: Final[list[KookitHTTPRequest | KookitHTTPResponse]] = []
         self.routers: Final[list[APIRouter]] = []
         self.lifespans: Final[list[ILifespan]] = []
-        self._response_groups: Sequence[ResponseGroup] = []
-
-        self.add_actions(*actions)
-        self.add_routers(*routers)
-        self.add_lifespans(*lifespans)
 
+        self._key: Final = uuid4().hex
         self._unique_url: Final = unique_url
         self._name: Final = name
         self._one_off: Final = one_off
+        # the states of the groups of the actions, which keep their place in there
+        self._states: GroupStates = GroupStates()
+        self._spec: Final = ServiceSpec(
+            key=self._key,
+            name=name,
+            routers=self.routers,
+            lifespans=self.lifespans,
+            metrics=ServiceMetrics(shards=server.workers),
+            journal=RequestJournal(journal_capacity, shards=server.workers),
+            faults=faults,
+        )
 
-        self._process_manager: ProcessManager | None = None
+        self._process_manager: AbstractContextManager | None = None
         self._active: bool = False
         self._startup_timeout: float = ProcessManager.DEFAULT_STARTUP_TIMEOUT
         self._shutdown_timeout: float = ProcessManager.DEFAULT_SHUTDOWN_TIMEOUT
 
+        self.add_actions(*actions)
+        self.add_routers(*routers)
+        self.add_lifespans(*lifespans)
+
     def __call__(
         self,
         startup_timeout: float = ProcessManager.DEFAULT_STARTUP_TIMEOUT,
@@ -74,13 +93,32 @@ class KookitHTTPService:
     def name(self) -> str:
         return self._name
 
+    @property
+    def key(self) -> str:
+        return self._key
+
     @property
     def unique_url(self) -> bool:
         return self._unique_url
 
+    @property
+    def response_groups(self) -> Sequence[ResponseGroup]:
+        return self._spec.response_groups
+
+    @property
+    def metrics(self) -> ServiceMetrics:
+        return self._spec.metrics
+
+    def calls(self, method: str | None = None, path: str | None = None) -> list[Call]:
+        """Return the last requests received, of a method and a path or a route path."""
+        return self._spec.journal.calls(method, path)
+
     def __str__(self) -> str:
         return f"[{self._name}]"
 
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_process_manager": None}
+
     def __repr__(self) -> str:
         return str(self)
 
@@ -110,63 +148,99 @@ class KookitHTTPService:
 
     def add_actions(self, *actions: KookitHTTPResponse | KookitHTTPRequest) -> None:
         self.actions.extend(actions)
-        self._response_groups = self.create_response_groups(
+        self.reload_actions()
+
+    def reset_actions(self) -> None:
+        self.actions.clear()
+        self._states = GroupStates()
+        self.reload_actions()
+
+    def reload_actions(self) -> None:
+        # the groups of the actions there were keep their states, wherever they are used
+        self._spec.response_groups = self.create_response_groups(
             self.actions,
             parent=self,
+            states=self._states,
+        )
+        # the histograms of the routes there were keep their place, as the states do
+        self._spec.metrics.grow(
+            sorted({(g.method, g.path) for g in self._spec.response_groups if g.responds})
         )
+        self.update()
+
+    def update(self) -> None:
+        """Apply actions and routers to the running server."""
+        if not self._active:
+            return
+        logger.trace("{}: updating running server [{}]", self, self.url)
+        self.server.update(self.spec(), timeout=self._startup_timeout)
+
+    def close(self) -> None:
+        self._spec.metrics.close()
+        self._spec.journal.close()
+
+    @property
+    def faults(self) -> Faults | None:
+        return self._spec.faults
+
+    def set_faults(self, faults: Faults | None) -> None:
+        """Inject faults into all the responses of the service, but those with their own."""
+        self._spec.faults = faults
+        self.update()
 
     def add_lifespans(self, *lifespans: ILifespan) -> None:
         self.lifespans.extend(lifespans)
 
     def add_routers(self, *routers: APIRouter) -> None:
         self.routers.extend(routers)
+        if routers:
+            self.update()
 
-    def router(self) -> APIRouter:
-        router = APIRouter()
-        for r in self.routers:
-            router.include_router(r)
-
-        for group in self._response_groups:
-            if group.response:
-                router.add_api_route(
-                    group.path,
-                    self.__endpoint__,
-                    methods=[group.method],
-                )
-
-        logger.trace(f"{self}: routes: {chr(10).join(str(r) for r in router.routes)}")
-        return router
+    def spec(self) -> ServiceSpec:
+        """Return the service compiled for servers. It's updated along with the service."""
+        return self._spec
 
     @property
     def lifespan(self) -> ILifespan:
         return Lifespans(*self.lifespans)
 
-    def start(self) -> None:
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def spawn(self) -> AbstractContextManager:
+        logger.trace("{}: starting server process [{}]", self, self.url)
+        return self.server.serve(
+            [self.spec()],
+            startup_timeout=self._startup_timeout,
+            shutdown_timeout=self._shutdown_timeout,
+            parent=f"{self}[{self.url}]",
+        )
+
+    def detach_process(self) -> AbstractContextManager | None:
+        process_manager, self._process_manager = self._process_manager, None
+        return process_manager
+
+    def start(self, process_manager: AbstractContextManager | None = None) -> None:
+        """Start the service. A given process manager is expected to be started already."""
         if self._active:
-            logger.trace(f"{self}: service already started")
+            logger.trace("{}: service already started", self)
             return
 
-        logger.trace(f"{self}: starting with response groups: {self._response_groups}")
+        logger.trace("{}: starting with response groups: {}", self, self._spec.response_groups)
 
         with ExitStack() as stack:
             _ = [
-                stack.enter_context(group) for group in self._response_groups if not group.response
+                stack.enter_context(group)
+                for group in self._spec.response_groups
+                if not group.responds
             ]
 
         if self._unique_url and not self._process_manager:
-            logger.trace(f"{self}: starting server process [{self.url}]")
-            server_process = Process(
-                target=self.server.run,
-                args=([self.router], [self.lifespan]),
-            )
-            self._process_manager = ProcessManager(
-                server_process,
-                startup_timeout=self._startup_timeout,
-                shutdown_timeout=self._shutdown_timeout,
-                parent=f"{self}[{self.url}]",
-                wait_func=self.server.wait,
-            )
-            self._process_manager.__enter__()
+            if not process_manager:
+                process_manager = self.spawn()
+                process_manager.__enter__()
+            self._process_manager = process_manager
 
         self._active = True
 
@@ -182,16 +256,17 @@ class KookitHTTPService:
             self.lifespans.clear()
 
         if self._unique_url and self._process_manager:
-            logger.trace(f"{self}: stop server process")
+            logger.trace("{}: stop server process", self)
             self._process_manager.__exit__(exc_type, exc_val, exc_tb)
             self._process_manager = None
 
-        active_groups = [group for group in self._response_groups if group.active]
+        active_groups = [group for group in self._spec.response_groups if group.active]
         if active_groups and not any([exc_type, exc_val, exc_tb]):
             msg = f"{self}: active groups left: {', '.join(str(g) for g in active_groups)}"
             raise RuntimeError(msg)
 
-        self._response_groups = []
+        self._spec.response_groups = []
+        self._states = GroupStates()
         self._active = False
 
     @staticmethod
@@ -199,58 +274,25 @@ class KookitHTTPService:
         actions: Iterable[KookitHTTPRequest | KookitHTTPResponse],
         *,
         parent: Any = "",
+        states: GroupStates | None = None,
     ) -> Sequence[ResponseGroup]:
-        groups: list[ResponseGroup] = []
+        scripts: list[tuple[KookitHTTPResponse | None, list[KookitHTTPRequest]]] = []
         for is_request, group in groupby(
             actions,
             key=lambda key: isinstance(key, KookitHTTPRequest),
         ):
             if is_request:
-                if not groups:
-                    groups.append(ResponseGroup(parent=parent))
-                groups[-1].add_requests(*group)  # type: ignore[arg-type]
+                if not scripts:
+                    scripts.append((None, []))
+                scripts[-1][1].extend(group)  # type: ignore[arg-type]
             else:
-                groups.extend(ResponseGroup(response, parent=parent) for response in group)  # type: ignore[arg-type]
+                scripts.extend((response, []) for response in group)  # type: ignore[misc]
 
+        if states is None:
+            states = GroupStates()
+        states.grow(len(scripts))
+        groups: list[ResponseGroup] = []
+        for index, (response, requests) in enumerate(scripts):
+            groups.append(ResponseGroup(response, parent=parent, states=states, index=index))
+            groups[-1].add_requests(*requests)
         return groups
-
-    async def __endpoint__(self, request: Request) -> Response:
-        group: ResponseGroup | None = None
-        cmp_request = SimpleNamespace(
-            content=await request.body(),
-            headers=request.headers,
-            url=request.url,
-            method=request.method,
-            path_params=request.path_params,
-        )
-        for gr in self._response_groups:
-            if gr == cmp_request:
-                group = gr
-                break
-
-        if not group:
-            return JSONResponse(
-                {
-                    "error": f"{self}: cannot find response for request:"
-                    f" <'{request.method}', {request.url}>"
-                },
-                status_code=400,
-            )
-
-        if not group.response:
-            msg = "Response group should specify response"
-            raise ValueError(msg)
-
-        def run_requests(group: ResponseGroup) -> None:
-            with group:
-                pass
-
-        requests_thread = Thread(target=run_requests, args=(group,), daemon=True)
-        requests_thread.start()
-
-        return Response(
-            content=group.response.content,
-            media_type=group.response.headers["content-type"],
-            headers=group.response.headers,
-            status_code=group.response.status_code,
-        )
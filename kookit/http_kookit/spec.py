@@ -0,0 +1,183 @@
+from __future__ import annotations
+import pickle
+import time
+from contextlib import suppress
+from functools import partial
+from typing import TYPE_CHECKING, Any, Final, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from starlette.routing import Route
+
+from kookit.logging import logger
+from kookit.utils import ILifespan, Lifespans
+from .body import match_body
+from .dispatch import DispatchIndex
+from .endpoint import IncomingRequest, ServiceEndpoint
+from .journal import JournalMiddleware
+
+
+if TYPE_CHECKING:
+    from starlette.types import Receive, Scope, Send
+
+    from .faults import Faults
+    from .journal import RequestJournal
+    from .metrics import ServiceMetrics
+    from .response_group import ResponseGroup
+
+
+class ServiceSpec:
+    """A service compiled for serving: what a server needs of it and nothing more.
+
+    Groups carry their matchers and pre-encoded responses, the metrics are a shared
+    memory handle, so a spec is cheap to pickle whatever the start method.
+    A spec of another version is refused by the server. The service keeps its spec
+    up to date, also when its lifespans change it inside of the server.
+    """
+
+    VERSION: Final = 2
+
+    def __init__(
+        self,
+        *,
+        key: str,
+        name: str,
+        groups: Sequence[ResponseGroup] = (),
+        routers: Sequence[APIRouter],
+        lifespans: Sequence[ILifespan],
+        metrics: ServiceMetrics,
+        journal: RequestJournal,
+        faults: Faults | None,
+    ) -> None:
+        self.version: int = self.VERSION
+        self.key: str = key
+        self.name: str = name
+        self.groups: Sequence[ResponseGroup] = groups
+        # shared with the service, so that routers added by its lifespans get routed
+        self.routers: Sequence[APIRouter] = routers
+        self.lifespans: Sequence[ILifespan] = lifespans
+        self.metrics: ServiceMetrics = metrics
+        self.journal: RequestJournal = journal
+        self.faults: Faults | None = faults
+        self.dispatch_index: DispatchIndex = DispatchIndex(groups)
+
+    def __str__(self) -> str:
+        return f"[{self.name}]"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __getstate__(self) -> dict:
+        # the index is cheaper to rebuild than to pickle
+        state: dict = {
+            key: value for key, value in self.__dict__.items() if key != "dispatch_index"
+        }
+        # compiled groups are plain data, pickled in one piece much faster than by dill,
+        # unless one holds what only dill pickles, e.g. the function of a stream
+        with suppress(pickle.PicklingError, AttributeError, TypeError):
+            state["groups"] = pickle.dumps(self.groups, pickle.HIGHEST_PROTOCOL)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        if state.get("version") != self.VERSION:
+            msg = f"service spec version {state.get('version')} is not {self.VERSION}"
+            raise ValueError(msg)
+        if isinstance(state["groups"], bytes):
+            state = {**state, "groups": pickle.loads(state["groups"])}  # noqa: S301
+        self.__dict__.update(state)
+        self.dispatch_index = DispatchIndex(self.groups)
+
+    @property
+    def response_groups(self) -> Sequence[ResponseGroup]:
+        return self.groups
+
+    @response_groups.setter
+    def response_groups(self, groups: Sequence[ResponseGroup]) -> None:
+        self.groups = groups
+        self.dispatch_index = DispatchIndex(groups)
+
+    @property
+    def lifespan(self) -> ILifespan:
+        return Lifespans(*self.lifespans)
+
+    def router(self) -> APIRouter:
+        router = APIRouter()
+        for r in self.routers:
+            router.include_router(r)
+
+        methods: dict[str, set[str]] = {}
+        for group in self.response_groups:
+            if group.responds:
+                methods.setdefault(group.path, set()).add(group.method)
+
+        for path, path_methods in methods.items():
+            router.routes.append(
+                Route(path, ServiceEndpoint(self.__endpoint__), methods=sorted(path_methods))
+            )
+
+        if logger.enabled("TRACE"):
+            logger.trace("{}: routes: {}", self, "\n".join(str(r) for r in router.routes))
+        return router
+
+    async def __endpoint__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        started_at: float = time.perf_counter()
+        request = IncomingRequest(scope)
+        # read as far as the journal keeps it, see JournalMiddleware
+        group, _ = await match_body(
+            receive,
+            partial(self.dispatch_index.candidates, request),
+            length=request.content_length,
+            keep=self.journal.slot_size,
+        )
+        matching: float = time.perf_counter() - started_at
+        shard: int = scope["app"].state.worker
+        scope[JournalMiddleware.ROUTE] = (group.method, group.path) if group else None
+
+        if not group:
+            logger.trace(
+                "{}: no response group matches <'{}', {}>", self, request.method, request.url
+            )
+            response = JSONResponse(
+                {
+                    "error": f"{self}: cannot find response for request:"
+                    f" <'{request.method}', {request.url}>"
+                },
+                status_code=400,
+            )
+            self.metrics.observe(
+                None,
+                matching=matching,
+                serving=time.perf_counter() - started_at,
+                shard=shard,
+            )
+            await response(scope, receive, send)
+            return
+
+        faults: Faults | None = group.faults or self.faults
+        if faults:
+            fault: str | None = faults.draw()
+            await faults.delay()
+            if fault:
+                logger.trace("{}: {} injects {} into {}", self, faults, fault, group)
+                group.release()
+                self.metrics.observe(
+                    (group.method, group.path),
+                    matching=matching,
+                    serving=time.perf_counter() - started_at,
+                    fault=True,
+                    shard=shard,
+                )
+                await faults.inject(fault, scope, receive, send)
+                return
+            send = faults.delayed(send)
+
+        scope["app"].state.follow_up_runner.run(group)
+
+        # recorded before responding, so clients never see a response ahead of its metrics
+        self.metrics.observe(
+            (group.method, group.path),
+            matching=matching,
+            serving=time.perf_counter() - started_at,
+            shard=shard,
+        )
+        await group.respond(scope, send)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Final
+
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from multiprocess.shared_memory import SharedMemory
+from multiprocess.util import Finalize
+
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+__all__ = ["GroupStates"]
+
+
+def release(memory: SharedMemory) -> None:
+    memory.close()
+    memory.unlink()
+
+
+class GroupStates:
+    """Whether each of the response groups of a service is still active, a byte per group.
+
+    The bytes live in named shared memory, so the states are shared by the test process
+    and every process serving the service, whatever the start method and however the
+    service got there, and the number of groups costs no more allocations.
+    A byte is stored at once, so groups are deactivated without a lock. A group is claimed
+    by a request that matches it, with a compare and swap under a lock of its byte
+    of the block, so that it's claimed once whatever the number of workers.
+
+    The states grow with the groups of a service by blocks added after the others: the byte
+    of a group never moves, so copies of the states from before keep working on it, e.g.
+    those of the follow-up requests of a group that is still running.
+    """
+
+    ACTIVE: Final = 1
+    CLAIMED: Final = 2
+    DONE: Final = 0
+
+    def __init__(self, size: int = 0, *, blocks: Sequence[tuple[str, int]] = ()) -> None:
+        # a block with the index of its first state and its number of states
+        self.blocks: Final[list[tuple[SharedMemory, int, int]]] = []
+        self.size: int = 0
+        for name, block_size in blocks:
+            self.blocks.append((SharedMemory(name), self.size, block_size))
+            self.size += block_size
+        self.grow(size)
+
+    def __str__(self) -> str:
+        return f"[GroupStates({', '.join(memory.name for memory, *_ in self.blocks)})]"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getstate__(self) -> dict:
+        return {"blocks": [(memory.name, size) for memory, _, size in self.blocks]}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(blocks=state["blocks"])  # type: ignore[misc]
+
+    def grow(self, size: int) -> None:
+        """Make room for the states of `size` groups, the new ones active."""
+        if size <= self.size:
+            return
+        # twice as large at least, so that groups added one by one make few blocks
+        block_size: int = max(size - self.size, self.size)
+        memory = SharedMemory(create=True, size=block_size)
+        memory.buf[:block_size] = bytes([self.ACTIVE]) * block_size
+        # unlinked once the states are gone, by the process that has created the block only
+        Finalize(self, release, args=(memory,), exitpriority=0)
+        self.blocks.append((memory, self.size, block_size))
+        self.size += block_size
+
+    def locate(self, index: int) -> tuple[SharedMemory, int]:
+        for memory, start, _ in reversed(self.blocks):
+            if index >= start:
+                return memory, index - start
+        msg = f"{self}: no state {index}"
+        raise IndexError(msg)
+
+    def active(self, index: int) -> bool:
+        memory, offset = self.locate(index)
+        return memory.buf[offset] != self.DONE
+
+    def available(self, index: int) -> bool:
+        memory, offset = self.locate(index)
+        return memory.buf[offset] == self.ACTIVE
+
+    def deactivate(self, index: int) -> None:
+        memory, offset = self.locate(index)
+        memory.buf[offset] = self.DONE
+
+    def claim(self, index: int) -> bool:
+        return self.swap(index, self.ACTIVE, self.CLAIMED)
+
+    def release(self, index: int) -> bool:
+        return self.swap(index, self.CLAIMED, self.ACTIVE)
+
+    def swap(self, index: int, expected: int, state: int) -> bool:
+        """Set the state of a group if it's the expected one, atomically across processes."""
+        memory, offset = self.locate(index)
+        # record locks exclude other processes only, claims of a process come from its loop
+        fd: int | None = memory._fd if fcntl else None  # noqa: SLF001
+        if fd is not None:
+            fcntl.lockf(fd, fcntl.LOCK_EX, 1, offset)
+        try:
+            if memory.buf[offset] != expected:
+                return False
+            memory.buf[offset] = state
+            return True
+        finally:
+            if fd is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, offset)
@@ -0,0 +1,26 @@
+"""Preloaded by the fork server that kookit server processes are forked from.
+
+The module imports everything a server process needs and freezes the heap, so that
+servers forked from the zygote skip the imports and share its pages copy-on-write:
+the garbage collector never visits frozen objects, so it never dirties their pages.
+Importing the module anywhere else freezes the heap of that process.
+"""
+
+import gc
+from importlib import import_module
+from typing import Final
+
+
+PRELOADED: Final = (
+    "uvicorn.lifespan.on",
+    "uvicorn.loops.asyncio",
+    "uvicorn.protocols.http.h11_impl",
+    "uvicorn.protocols.websockets.auto",
+    "kookit.http_kookit.server",
+    "kookit.http_kookit.spec",
+)
+
+for module in PRELOADED:
+    import_module(module)
+
+gc.freeze()
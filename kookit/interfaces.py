@@ -7,7 +7,9 @@ if TYPE_CHECKING:
 
     from fastapi import APIRouter
 
-    from .http_kookit import KookitHTTPRequest, KookitHTTPResponse
+    from .http_kookit import Faults, KookitHTTPRequest, KookitHTTPResponse
+    from .http_kookit.journal import Call
+    from .http_kookit.metrics import ServiceMetrics
     from .utils import ILifespan
 
 
@@ -17,6 +19,9 @@ class IKookitHTTPService(Protocol):
     @property
     def name(self) -> str: ...
     @property
+    def metrics(self) -> ServiceMetrics: ...
+    def calls(self, method: str | None = None, path: str | None = None) -> list[Call]: ...
+    @property
     def __enter__(self) -> Any: ...
     def __exit__(
         self,
@@ -32,6 +37,8 @@ class IKookitHTTPService(Protocol):
         tb: TracebackType | None,
     ) -> None: ...
     def add_actions(self, *actions: KookitHTTPResponse | KookitHTTPRequest) -> None: ...
+    def reset_actions(self) -> None: ...
+    def set_faults(self, faults: Faults | None) -> None: ...
     def add_lifespans(self, *lifespans: ILifespan) -> None: ...
     def add_routers(self, *routers: APIRouter) -> None: ...
     def start(self) -> None: ...
@@ -5,11 +5,11 @@ import time
 from typing import TYPE_CHECKING, Final, Iterable, Mapping
 
 import anyio
-import pytest
 from typing_extensions import Self
 
-from .client_side import KookitHTTPClient
-from .http_kookit import HTTPKookit, KookitHTTPRequest, KookitHTTPResponse
+from .client_side import KookitAsyncHTTPClient, KookitHTTPClient
+from .http_kookit import HTTPKookit, KookitHTTPRequest, KookitHTTPResponse, KookitHTTPServerPool
+from .http_kookit.journal import RequestJournal
 from .interfaces import IKookitHTTPService
 from .logging import logger
 from .utils import ILifespan, ProcessManager, lvalue_from_assign
@@ -21,14 +21,25 @@ if TYPE_CHECKING:
     from fastapi import APIRouter
     from pytest_mock import MockerFixture
 
+    from .http_kookit import Faults
 
-__all__ = ["IKookitHTTPService", "Kookit", "kookit"]
 
+__all__ = ["IKookitHTTPService", "Kookit"]
 
-class Kookit(KookitHTTPClient):
-    def __init__(self, mocker: MockerFixture) -> None:
+
+class Kookit(KookitHTTPClient, KookitAsyncHTTPClient):
+    def __init__(
+        self,
+        mocker: MockerFixture,
+        pool: KookitHTTPServerPool | None = None,
+        *,
+        in_process: bool = False,
+        start_method: str | None = None,
+    ) -> None:
         self.mocker: Final[MockerFixture] = mocker
-        self.http_kookit: Final = HTTPKookit(mocker)
+        self.http_kookit: Final = HTTPKookit(
+            mocker, pool, in_process=in_process, start_method=start_method
+        )
         super().__init__()
 
     def __str__(self) -> str:
@@ -49,7 +60,7 @@ class Kookit(KookitHTTPClient):
         return self
 
     def __enter__(self) -> Self:
-        logger.trace(f"{self}: starting services")
+        logger.trace("{}: starting services", self)
         for kookit in [self.http_kookit]:
             kookit.__enter__()
         return self
@@ -60,7 +71,11 @@ class Kookit(KookitHTTPClient):
         exc: BaseException | None,
         tb: TracebackType | None,
     ) -> None:
-        logger.trace(f"{self}: stopping services")
+        logger.trace("{}: stopping services", self)
+        self.close_clients()
+        if self.async_clients:
+            logger.trace("{}: async clients can only be closed by 'async with'", self)
+            self.async_clients.clear()
         for kookit in [self.http_kookit]:
             kookit.__exit__(typ, exc, tb)
 
@@ -73,6 +88,7 @@ class Kookit(KookitHTTPClient):
         exc: BaseException | None,
         tb: TracebackType | None,
     ) -> None:
+        await self.aclose_clients()
         return self.__exit__(typ, exc, tb)
 
     def new_http_service(
@@ -84,6 +100,10 @@ class Kookit(KookitHTTPClient):
         routers: Iterable[APIRouter] = (),
         lifespans: Iterable[ILifespan] = (),
         name: str = "",
+        in_process: bool | None = None,
+        faults: Faults | None = None,
+        workers: int = 1,
+        journal_capacity: int = RequestJournal.CAPACITY,
     ) -> IKookitHTTPService:
         name = name or lvalue_from_assign()
         return self.http_kookit.new_service(
@@ -93,6 +113,10 @@ class Kookit(KookitHTTPClient):
             routers=routers,
             lifespans=lifespans,
             name=name,
+            in_process=in_process,
+            faults=faults,
+            workers=workers,
+            journal_capacity=journal_capacity,
         )
 
     def sleep(self, seconds: float) -> None:
@@ -104,13 +128,10 @@ class Kookit(KookitHTTPClient):
     def patch_env(self, new_env: Mapping[str, str]) -> None:
         self.mocker.patch.dict(os.environ, new_env)
 
+    def close(self) -> None:
+        for kookit in [self.http_kookit]:
+            kookit.close()
+
     @staticmethod
     def show_logs() -> None:
-        logger.remove()
-        logger.add(sys.stdout, level="TRACE")
-
-
-@pytest.fixture()
-def kookit(mocker: MockerFixture) -> Iterable[Kookit]:
-    # ruff: noqa: PT022
-    yield Kookit(mocker)
+        logger.show(sys.stdout)
@@ -1,12 +1,128 @@
+"""Level-gated logging of kookit.
+
+Messages are `str.format` templates with their arguments, formatted only when a record
+is emitted, so a record below the level costs a comparison. Records are emitted
+with loguru when it's installed, or printed otherwise.
+
+An opt-in ring buffer keeps the last records of every level unformatted, e.g. to show
+them only for a failed test (see the `--kookit-log-buffer` option).
+"""
+
+from __future__ import annotations
+import os
+import sys
+import time
+from collections import deque
+from typing import IO, Any, Final, Iterable
+
+
 try:
-    from loguru import logger
+    from loguru import logger as loguru_logger
 except ModuleNotFoundError:
-    from unittest.mock import Mock
-
-    logger = Mock(
-        trace=print,
-        debug=print,
-        info=print,
-        warning=print,
-        error=print,
-    )
+    loguru_logger = None  # type: ignore[assignment]
+
+
+__all__ = ["KookitLogger", "logger"]
+
+
+LEVELS: Final = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+
+class KookitLogger:
+    def __init__(self, level: str = "DEBUG", buffer: int = 0) -> None:
+        self.level: str = level
+        self.level_no: int = LEVELS[level]
+        self.buffer: deque[tuple[float, str, str, tuple]] | None = (
+            deque(maxlen=buffer) if buffer else None
+        )
+
+    def configure(self, *, level: str | None = None, buffer: int | None = None) -> None:
+        """Set the level and the size of the ring buffer (none with 0), emptying it."""
+        if level is not None:
+            self.level, self.level_no = level, LEVELS[level]
+        if buffer is not None:
+            self.buffer = deque(maxlen=buffer) if buffer else None
+
+    def settings(self) -> dict[str, Any]:
+        """Return the configuration, e.g. for the logger of a child process."""
+        return {"level": self.level, "buffer": self.buffer.maxlen if self.buffer else 0}
+
+    def enabled(self, level: str) -> bool:
+        return self.buffer is not None or LEVELS[level] >= self.level_no
+
+    def log(self, level: str, message: str, *args: Any) -> None:
+        if self.buffer is not None:
+            self.buffer.append((time.time(), level, message, args))
+        if LEVELS[level] < self.level_no:
+            return
+        text: str = message.format(*args) if args else message
+        if loguru_logger:
+            loguru_logger.opt(depth=2).log(level, text)
+        else:
+            print(text)  # noqa: T201
+
+    def trace(self, message: str, *args: Any) -> None:
+        self.log("TRACE", message, *args)
+
+    def debug(self, message: str, *args: Any) -> None:
+        self.log("DEBUG", message, *args)
+
+    def info(self, message: str, *args: Any) -> None:
+        self.log("INFO", message, *args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        self.log("WARNING", message, *args)
+
+    def error(self, message: str, *args: Any) -> None:
+        self.log("ERROR", message, *args)
+
+    def show(self, sink: IO[str] = sys.stdout) -> None:
+        """Emit records of every level to a sink."""
+        self.configure(level="TRACE")
+        if loguru_logger:
+            loguru_logger.remove()
+            loguru_logger.add(sink, level="TRACE")
+
+    def export(self) -> list[tuple[float, str, str, tuple]]:
+        """Take the records out of the buffer, formatted, e.g. for another process to keep."""
+        records: list[tuple[float, str, str, tuple]] = [
+            (created, level, message.format(*args) if args else message, ())
+            for created, level, message, args in self.buffer or ()
+        ]
+        if self.buffer is not None:
+            self.buffer.clear()
+        return records
+
+    def keep(self, records: Iterable[tuple[float, str, str, tuple]]) -> None:
+        """Put records exported by another process into the buffer."""
+        if self.buffer is not None:
+            self.buffer.extend(records)
+
+    def drain(self) -> list[str]:
+        """Format the records of the buffer in order of time and empty it."""
+        lines: list[str] = [
+            self.format(*record) for record in sorted(self.buffer or (), key=lambda r: r[0])
+        ]
+        if self.buffer is not None:
+            self.buffer.clear()
+        return lines
+
+    @staticmethod
+    def format(created: float, level: str, message: str, args: tuple) -> str:
+        timestamp: str = time.strftime("%H:%M:%S", time.localtime(created))
+        text: str = message.format(*args) if args else message
+        return f"{timestamp}.{int(created % 1 * 1000):03d} | {level:<8} | {text}"
+
+
+logger: Final = KookitLogger(
+    os.environ.get("KOOKIT_LOG_LEVEL", "DEBUG"),
+    int(os.environ.get("KOOKIT_LOG_BUFFER", "0")),
+)
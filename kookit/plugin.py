@@ -0,0 +1,111 @@
+"""The pytest plugin: options and fixtures.
+
+Loaded for every pytest session, so it imports kookit itself only once a fixture is used.
+"""
+
+from __future__ import annotations
+import sys
+from typing import TYPE_CHECKING, Any, Final, Generator, Iterable
+
+import pytest
+
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+    from .http_kookit import KookitHTTPServerPool
+    from .kookit import Kookit
+
+
+__all__ = [
+    "_kookit_servers_started",
+    "kookit",
+    "kookit_server_pool",
+    "pytest_addoption",
+    "pytest_configure",
+    "pytest_runtest_makereport",
+]
+
+
+START_METHODS: Final = ("fork", "spawn", "forkserver")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    help_msg: Final = "Reuse kookit server processes across tests"
+    parser.addoption("--kookit-reuse-servers", action="store_true", help=help_msg)
+    parser.addini("kookit_reuse_servers", help=help_msg, type="bool", default=False)
+
+    start_method_help: Final = (
+        "Start method of kookit server processes, forkserver forks them from a preloaded zygote"
+    )
+    parser.addoption("--kookit-start-method", choices=START_METHODS, help=start_method_help)
+    parser.addini("kookit_start_method", help=start_method_help, default=None)
+
+    log_buffer_help: Final = "Show the last N kookit log records of every level for failed tests"
+    parser.addoption("--kookit-log-buffer", type=int, metavar="N", help=log_buffer_help)
+    parser.addini("kookit_log_buffer", help=log_buffer_help, default="0")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    size: int = config.getoption("kookit_log_buffer") or int(config.getini("kookit_log_buffer"))
+    if size:
+        from .logging import logger
+
+        logger.configure(buffer=size)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport() -> Generator[None, Any, None]:
+    outcome = yield
+    # nothing has been logged unless kookit has been imported
+    logging = sys.modules.get("kookit.logging")
+    if not logging or logging.logger.buffer is None:
+        return
+    report: pytest.TestReport = outcome.get_result()
+    if report.failed:
+        report.sections.append(("kookit log", "\n".join(logging.logger.drain())))
+    elif report.when == "teardown":
+        logging.logger.drain()
+
+
+def configured_start_method(config: pytest.Config) -> str | None:
+    method: str | None = config.getoption("kookit_start_method") or config.getini(
+        "kookit_start_method"
+    )
+    if method and method not in START_METHODS:
+        msg = f"kookit_start_method should be one of {START_METHODS}, got {method}"
+        raise pytest.UsageError(msg)
+    return method
+
+
+def reuse_servers(config: pytest.Config) -> bool:
+    return bool(config.getoption("kookit_reuse_servers") or config.getini("kookit_reuse_servers"))
+
+
+@pytest.fixture(scope="session")
+def kookit_server_pool(request: pytest.FixtureRequest) -> Iterable[KookitHTTPServerPool]:
+    from .http_kookit import KookitHTTPServerPool
+
+    pool = KookitHTTPServerPool(start_method=configured_start_method(request.config))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _kookit_servers_started(request: pytest.FixtureRequest) -> None:
+    """Start the reused servers before the first test, so none is forked from a test."""
+    if reuse_servers(request.config):
+        request.getfixturevalue("kookit_server_pool").start()
+
+
+@pytest.fixture()
+def kookit(mocker: MockerFixture, request: pytest.FixtureRequest) -> Iterable[Kookit]:
+    from .kookit import Kookit
+
+    pool: KookitHTTPServerPool | None = None
+    if reuse_servers(request.config):
+        pool = request.getfixturevalue("kookit_server_pool")
+
+    kookit = Kookit(mocker, pool, start_method=configured_start_method(request.config))
+    yield kookit
+    kookit.close()
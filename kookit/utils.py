@@ -1,13 +1,16 @@
 from __future__ import annotations
 import contextlib
 import json
+import socket
 import sys
 import time
-from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, asynccontextmanager
 from traceback import extract_stack
-from typing import TYPE_CHECKING, Any, Callable, Final
+from typing import TYPE_CHECKING, Any, Callable, Final, Protocol, Sequence, runtime_checkable
 from uuid import UUID
 
+from multiprocess.connection import wait
+
 from kookit.logging import logger
 
 
@@ -16,6 +19,7 @@ if TYPE_CHECKING:
     from types import TracebackType
 
     from multiprocess import Process
+    from multiprocess.connection import Connection
     from typing_extensions import Self
 
 if sys.version_info >= (3, 9):
@@ -51,6 +55,30 @@ def lvalue_from_assign(depth: int = 3) -> str:
     return text[:pos].strip()
 
 
+def bind_port(host: str) -> socket.socket:
+    sock = socket.socket(
+        socket.AF_INET6 if ":" in host else socket.AF_INET,
+        socket.SOCK_STREAM,
+        socket.IPPROTO_TCP,  # asyncio enables TCP_NODELAY for TCP sockets only
+    )
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, 0))
+    return sock
+
+
+def listening_socket(bound: socket.socket) -> socket.socket:
+    # The bound socket only reserves the port: listening on a twin socket keeps
+    # connections refused (not queued) once the server process is gone.
+    if not hasattr(socket, "SO_REUSEPORT"):
+        return bound
+    sock = socket.socket(bound.family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(bound.getsockname()[:2])
+    return sock
+
+
 class UUIDEncoder(json.JSONEncoder):
     def default(self, value: Any) -> str:
         if isinstance(value, UUID):
@@ -69,34 +97,77 @@ class ProcessManager:
         startup_timeout: float,
         shutdown_timeout: float,
         parent: Any,
-        wait_func: Callable[[float], bool],
+        ready: Connection,
     ) -> None:
         self.process: Final = process
         self.startup_timeout: Final = startup_timeout
         self.parent: Final = parent
-        self.wait_func: Final = wait_func
+        self.ready: Final = ready
         self.shutdown_timeout: Final = shutdown_timeout
+        self.started_at: float = 0.0
+        self.startup_duration: float | None = None
 
     def __repr__(self) -> str:
         return self.parent
 
-    def __enter__(self) -> Self:
+    def wait_ready(self, timeout: float) -> bool:
+        # the process sentinel wakes us up as soon as the process dies
+        if self.ready not in wait([self.ready, self.process.sentinel], timeout):
+            return False
+        return bool(self.ready.recv())
+
+    def start(self) -> None:
+        while self.ready.poll():
+            # a late signal of a previous start that timed out
+            self.ready.recv()
+
+        self.started_at = time.perf_counter()
         self.process.start()
-        time.sleep(0.01)
 
-        logger.trace(
-            f"{self}: waiting for process to start ({self.startup_timeout} seconds)",
-        )
-        is_started: bool = self.wait_func(self.startup_timeout)
+    def wait(self) -> None:
+        logger.trace("{}: waiting for process to start ({} seconds)", self, self.startup_timeout)
+        timeout: float = self.started_at + self.startup_timeout - time.perf_counter()
+        is_started: bool = self.wait_ready(max(timeout, 0))
 
         if not is_started:
             logger.trace(
-                f"{self}: process didn't respond for {self.startup_timeout} seconds. Stopping."
+                "{}: process didn't start (exitcode {}). Stopping.", self, self.process.exitcode
             )
-            self.__exit__(None, None, None)
+            self.stop()
+            self.join()
             msg = f"{self}: process was not started. Check logs."
             raise RuntimeError(msg)
 
+        self.startup_duration = time.perf_counter() - self.started_at
+        logger.trace("{}: process started in {:.3f} seconds", self, self.startup_duration)
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self) -> None:
+        logger.trace("{}: stopping server process", self)
+        self.process.terminate()
+
+    def join(self) -> None:
+        logger.trace("{}: waiting for process to join ({} seconds)", self, self.shutdown_timeout)
+        deadline: float = time.perf_counter() + self.shutdown_timeout
+        # log records left by the process may not fit into the pipe, so they're read meanwhile
+        while self.ready in wait(
+            [self.ready, self.process.sentinel], max(deadline - time.perf_counter(), 0)
+        ):
+            records = self.ready.recv()
+            if isinstance(records, list):
+                logger.keep(records)
+        self.process.join(max(deadline - time.perf_counter(), 0))
+        if self.process.exitcode is None:
+            self.process.kill()
+            self.process.join(self.shutdown_timeout)
+
+        logger.trace("{}: process joined ({})", self, self.process.exitcode)
+
+    def __enter__(self) -> Self:
+        self.start()
+        self.wait()
         return self
 
     def __exit__(
@@ -105,12 +176,116 @@ class ProcessManager:
         exc: BaseException | None,
         tb: TracebackType | None,
     ) -> None:
-        logger.trace(f"{self}: stopping server process")
-        self.process.terminate()
-        logger.trace(f"{self}: waiting for process to join ({self.shutdown_timeout} seconds)")
-        self.process.join(self.shutdown_timeout)
-        if self.process.exitcode is None:
-            self.process.kill()
-            self.process.join(self.shutdown_timeout)
+        self.stop()
+        self.join()
+
+
+class ProcessGroup:
+    """Processes started, awaited and stopped together, e.g. the workers of a server."""
+
+    def __init__(self, managers: Sequence[ProcessManager], *, parent: Any) -> None:
+        self.managers: Final = list(managers)
+        self.parent: Final = parent
+
+    def __repr__(self) -> str:
+        return self.parent
+
+    def is_alive(self) -> bool:
+        return all(manager.is_alive() for manager in self.managers)
+
+    def start(self) -> None:
+        for index, manager in enumerate(self.managers):
+            try:
+                manager.start()
+            except Exception:  # noqa: PERF203
+                stop_all(self.managers[:index], None, None, None)
+                raise
+
+    def wait(self) -> None:
+        try:
+            for manager in self.managers:
+                manager.wait()
+        except Exception:
+            # a failed manager is stopped already, the others are not
+            stop_all(self.managers, None, None, None)
+            raise
+
+    def stop(self) -> None:
+        for manager in self.managers:
+            manager.stop()
+
+    def join(self) -> None:
+        for manager in self.managers:
+            manager.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        self.wait()
+        return self
+
+    def __exit__(
+        self,
+        typ: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+        self.join()
+
+
+@runtime_checkable
+class IStartable(Protocol):
+    def start(self) -> None: ...
+
+    def wait(self) -> None: ...
+
+
+@runtime_checkable
+class IStoppable(Protocol):
+    def stop(self) -> None: ...
+
+    def join(self) -> None: ...
+
+
+def start_all(managers: Sequence[AbstractContextManager]) -> None:
+    # Everything is launched first and awaited afterwards,
+    # so startup takes as long as the slowest manager.
+    started: list[AbstractContextManager] = []
+    error: Exception | None = None
+    for manager in managers:
+        try:
+            if isinstance(manager, IStartable):
+                manager.start()
+            else:
+                manager.__enter__()
+        except Exception as exc:  # noqa: BLE001
+            error = exc
+            break
+        started.append(manager)
+
+    for manager in [m for m in started if isinstance(m, IStartable)]:
+        try:
+            manager.wait()
+        except Exception as exc:  # noqa: BLE001, PERF203
+            started.remove(manager)
+            error = error or exc
+
+    if error:
+        stop_all(started, None, None, None)
+        raise error
+
 
-        logger.trace(f"{self}: process joined ({self.process.exitcode})")
+def stop_all(
+    managers: Sequence[AbstractContextManager],
+    typ: type[BaseException] | None,
+    exc: BaseException | None,
+    tb: TracebackType | None,
+) -> None:
+    for manager in managers:
+        if isinstance(manager, IStoppable):
+            manager.stop()
+        else:
+            manager.__exit__(typ, exc, tb)
+    for manager in managers:
+        if isinstance(manager, IStoppable):
+            manager.join()
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any
+
+from kookit import Cassette, Kookit, KookitJSONResponse
+
+
+def test_record_and_replay(mocker: Any, tmp_path: Path) -> None:
+    cassette = Cassette(tmp_path / "upstream.kkc")
+
+    kookit = Kookit(mocker)
+    upstream = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({"id": 1}, url="/items/1", headers={"x-upstream": "1"}),
+            KookitJSONResponse({"page": 2}, url="/items"),
+            KookitJSONResponse({"created": True}, url="/items", method="POST", status_code=201),
+        ]
+    )
+    recorder = kookit.new_http_service(routers=[cassette.record(upstream.url)], unique_url=True)
+    with kookit:
+        assert kookit.get(recorder, "/items/1").json() == {"id": 1}
+        assert kookit.get(recorder, "/items?page=2").json() == {"page": 2}
+        assert kookit.post(recorder, "/items", json={"name": "new"}).status_code == 201
+    kookit.close()
+    assert len(cassette) == 3
+
+    kookit = Kookit(mocker)
+    player = kookit.new_http_service(routers=[cassette.replay()], unique_url=True)
+    with kookit:
+        created = kookit.post(player, "/items", json={"name": "new"})
+        assert (created.status_code, created.json()) == (201, {"created": True})
+        item = kookit.get(player, "/items/1")
+        assert (item.json(), item.headers["x-upstream"]) == ({"id": 1}, "1")
+        assert kookit.get(player, "/items?page=2").json() == {"page": 2}
+        # every interaction is played once
+        assert kookit.get(player, "/items/1").status_code == 400
+    kookit.close()
+
+
+def test_cassette_index(tmp_path: Path) -> None:
+    cassette = Cassette(tmp_path / "index.kkc")
+    cassette.record("http://upstream")
+    for index in range(100):
+        cassette.append(b"GET", f"/{index % 10}?n={index}".encode(), b"", 200, b"", b"%d" % index)
+    cassette.seal()
+    assert len(cassette) == 100
+
+    player = cassette.replay().routes[0].app  # type: ignore[attr-defined]
+    assert len(player.candidates(b"GET", b"/3")) == 10
+    assert player.candidates(b"POST", b"/3") == []
+    # the same query first, then in recorded order
+    assert player.play(b"GET", b"/3?n=53", b"") == (200, b"", b"53")
+    assert player.play(b"GET", b"/3", b"") == (200, b"", b"3")
+
+    # recorded on, then indexed again
+    cassette.record("http://upstream")
+    cassette.append(b"GET", b"/new", b"", 200, b"", b"new")
+    cassette.seal()
+    assert len(cassette) == 101
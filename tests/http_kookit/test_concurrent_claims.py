@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+import pytest
+
+from kookit import Kookit, KookitHTTPResponse
+
+
+RESPONSES = 50
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_concurrent_identical_requests(kookit: Kookit, workers: int) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitHTTPResponse("/once", "GET", text=str(index)) for index in range(RESPONSES)
+        ],
+        workers=workers,
+    )
+
+    async def requests() -> list:
+        # concurrent requests come on connections of their own
+        async with httpx.AsyncClient(base_url=service.url) as client:
+            return await asyncio.gather(*(client.get("/once") for _ in range(2 * RESPONSES)))
+
+    with kookit:
+        responses: list = asyncio.run(requests())
+
+    # every response is served exactly once, the requests left over find none
+    served: list = sorted(int(r.text) for r in responses if r.status_code == 200)
+    assert served == list(range(RESPONSES))
+    assert sum(r.status_code == 400 for r in responses) == RESPONSES
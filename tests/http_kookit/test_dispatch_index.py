@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+from typing import Any
+
+from starlette.datastructures import URL, Headers
+
+from kookit.http_kookit.dispatch import DispatchIndex
+from kookit.http_kookit.service import KookitHTTPResponse, KookitHTTPService
+
+
+def incoming(method: str, url: str, *, content: bytes = b"", headers: Any = None) -> Any:
+    return SimpleNamespace(
+        method=method,
+        url=URL(url),
+        content=content,
+        headers=Headers(headers or {}),
+    )
+
+
+def test_dispatch_in_declaration_order(faker: Any) -> None:
+    paths: list = [f"/{faker.uri_path()}" for _ in range(100)]
+    groups = KookitHTTPService.create_response_groups(
+        [
+            KookitHTTPResponse("/items/{item_id}", "GET"),
+            *(KookitHTTPResponse(path, "GET") for path in paths),
+            KookitHTTPResponse("/items/1", "GET"),
+            KookitHTTPResponse("/items/{item_id}", "POST", request_content=b"body"),
+        ]
+    )
+    index = DispatchIndex(groups)
+
+    assert index.lookup(incoming("GET", "/items/1")) is groups[0]
+    groups[0].deactivate()
+    assert index.lookup(incoming("GET", "/items/1")) is groups[-2]
+    assert index.lookup(incoming("GET", paths[50])) is groups[51]
+    assert index.lookup(incoming("POST", "/items/2")) is None
+    assert index.lookup(incoming("POST", "/items/2", content=b"body")) is groups[-1]
+
+
+def test_dispatch_matchers() -> None:
+    groups = KookitHTTPService.create_response_groups(
+        [
+            KookitHTTPResponse(
+                "/search",
+                "GET",
+                request_params={"q": "kookit"},
+                request_headers={"X-Token": "secret"},
+            ),
+            KookitHTTPResponse("/search", "GET"),
+        ]
+    )
+    index = DispatchIndex(groups)
+
+    headers: dict = {"x-token": "secret"}
+    assert index.lookup(incoming("GET", "/search?q=kookit", headers=headers)) is groups[0]
+    assert index.lookup(incoming("GET", "/search?q=other", headers=headers)) is groups[1]
+    groups[1].deactivate()
+    assert index.lookup(incoming("GET", "/search?q=kookit")) is None
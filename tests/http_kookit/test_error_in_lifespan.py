@@ -1,3 +1,4 @@
+import time
 from contextlib import asynccontextmanager
 from typing import Any
 
@@ -26,3 +27,21 @@ def test_error_in_lifespan(
 
     with pytest.raises(RuntimeError), context(0.5):
         kookit.sleep(1.0)
+
+
+def test_error_in_lifespan_fails_fast(kookit: Kookit) -> None:
+    service = kookit.new_http_service(unique_url=True)
+
+    @asynccontextmanager
+    async def lifespan(_app: Any) -> Any:
+        msg = "some error"
+        raise ValueError(msg)
+        yield
+
+    service.add_lifespans(lifespan)
+
+    context: Any = service
+    started_at: float = time.perf_counter()
+    with pytest.raises(RuntimeError), context(10.0):
+        pass
+    assert time.perf_counter() - started_at < 5.0
@@ -0,0 +1,79 @@
+import time
+from random import Random
+
+import httpx
+import pytest
+
+from kookit import (
+    Faults,
+    Kookit,
+    KookitHTTPResponse,
+    LogNormalLatency,
+    NormalLatency,
+    PercentileLatency,
+)
+
+
+def test_latency_distributions() -> None:
+    random = Random(0)
+    table = PercentileLatency({50: 0.01, 99: 0.1})
+    samples = sorted(table.sample(random) for _ in range(1000))
+    assert samples[0] >= 0
+    assert samples[-1] <= 0.1
+    assert samples[500] == pytest.approx(0.01, abs=0.002)
+    assert all(NormalLatency(0.01, 0.05).sample(random) >= 0 for _ in range(100))
+    assert LogNormalLatency(0.01, 0).sample(random) == pytest.approx(0.01)
+
+    with pytest.raises(ValueError, match="percentiles"):
+        PercentileLatency({0: 1})
+
+    faults = Faults(error_rate=0.25, reset_rate=0.25, seed=0)
+    draws = [faults.draw() for _ in range(1000)]
+    assert 150 < draws.count("error") < 350
+    assert 150 < draws.count("reset") < 350
+    assert draws.count("timeout") == 0
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_faults(kookit: Kookit, in_process: bool, capfd: pytest.CaptureFixture[str]) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitHTTPResponse(
+                "/slow", "GET", text="slow", faults=Faults(latency=0.2, first_byte=0.1)
+            ),
+            KookitHTTPResponse("/flaky", "GET", text="ok"),
+            KookitHTTPResponse("/reset", "GET", faults=Faults(reset_rate=1)),
+        ],
+        faults=Faults(error_rate=1, error_status=502),
+        in_process=in_process,
+    )
+
+    with kookit:
+        started_at: float = time.perf_counter()
+        assert kookit.get(service, "/slow").text == "slow"
+        assert time.perf_counter() - started_at >= 0.3
+
+        assert kookit.get(service, "/flaky").status_code == 502
+        service.set_faults(None)
+        assert kookit.get(service, "/flaky").text == "ok"
+
+        with pytest.raises(httpx.RemoteProtocolError):
+            kookit.get(service, "/reset")
+        assert service.metrics.faults == 2
+        service.reset_actions()
+
+    # injected faults are no server failures
+    assert "Traceback" not in capfd.readouterr().err
+
+
+def test_timeout_fault(kookit: Kookit) -> None:
+    service = kookit.new_http_service(
+        actions=[KookitHTTPResponse("/hang", "GET", faults=Faults(timeout_rate=1, hang=1))],
+    )
+
+    with kookit:
+        with pytest.raises(httpx.ReadTimeout):
+            kookit.get(service, "/hang", timeout=0.1)
+        with pytest.raises(httpx.RemoteProtocolError):
+            kookit.get(service, "/hang")
+        service.reset_actions()
@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from kookit import Kookit, KookitFileResponse
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_file_response(kookit: Kookit, tmp_path: Path, in_process: bool) -> None:
+    blob: bytes = os.urandom(300_000)
+    path: Path = tmp_path / "blob.bin"
+    path.write_bytes(blob)
+
+    service = kookit.new_http_service(
+        actions=[
+            KookitFileResponse(path, url="/blob"),
+            KookitFileResponse(path, url="/blob", request_headers={"Range": "bytes=100-199"}),
+            KookitFileResponse(path, url="/blob", request_headers={"Range": "bytes=-50"}),
+            KookitFileResponse(path, url="/blob", request_headers={"Range": "bytes=300000-"}),
+            KookitFileResponse(path, url="/part", offset=70_000, length=100_000),
+            KookitFileResponse(
+                path, url="/part", offset=70_000, request_headers={"Range": "bytes=5-"}
+            ),
+        ],
+        in_process=in_process,
+    )
+
+    with kookit:
+        full = kookit.get(service, "/blob")
+        assert (full.status_code, full.content) == (200, blob)
+        assert full.headers["content-type"] == "application/octet-stream"
+        assert full.headers["accept-ranges"] == "bytes"
+
+        middle = kookit.get(service, "/blob", headers={"Range": "bytes=100-199"})
+        assert (middle.status_code, middle.content) == (206, blob[100:200])
+        assert middle.headers["content-range"] == "bytes 100-199/300000"
+
+        suffix = kookit.get(service, "/blob", headers={"Range": "bytes=-50"})
+        assert (suffix.status_code, suffix.content) == (206, blob[-50:])
+
+        beyond = kookit.get(service, "/blob", headers={"Range": "bytes=300000-"})
+        assert beyond.status_code == 416
+        assert beyond.headers["content-range"] == "bytes */300000"
+
+        part = kookit.get(service, "/part")
+        assert part.content == blob[70_000:170_000]
+
+        tail = kookit.get(service, "/part", headers={"Range": "bytes=5-"})
+        assert (tail.status_code, tail.content) == (206, blob[70_005:])
@@ -0,0 +1,32 @@
+import pytest
+
+from kookit import Kookit, KookitJSONRequest, KookitJSONResponse
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+async def test_follow_up_fan_out(
+    random_uri_path: str,
+    kookit: Kookit,
+    in_process: bool,
+) -> None:
+    callee = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url=f"/callback/{i}", method="POST", request_json={"i": i})
+            for i in range(20)
+        ],
+        in_process=in_process,
+    )
+    caller = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url=random_uri_path),
+            *(
+                KookitJSONRequest(callee, url=f"/callback/{i}", json={"i": i}, request_delay=0.01)
+                for i in range(20)
+            ),
+        ],
+        in_process=in_process,
+    )
+
+    async with kookit:
+        assert kookit.get(caller, random_uri_path).status_code == 200
+        await kookit.asleep(1.0)
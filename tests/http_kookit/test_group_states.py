@@ -0,0 +1,58 @@
+from typing import Any
+
+import dill
+
+from kookit import Kookit, KookitHTTPResponse, KookitJSONResponse
+from kookit.http_kookit.service import KookitHTTPService
+
+
+def test_group_states_shared() -> None:
+    groups = KookitHTTPService.create_response_groups(
+        [KookitHTTPResponse(f"/{index}", "GET") for index in range(1000)]
+    )
+    # a single block holds the states of all the groups
+    assert len({str(group.states) for group in groups}) == 1
+    assert len(groups[0].states.blocks) == 1
+
+    copies = dill.loads(dill.dumps(groups))  # noqa: S301
+    copies[10].deactivate()
+    assert [index for index, group in enumerate(groups) if not group.active] == [10]
+
+
+def test_group_states_grown() -> None:
+    actions: list = [KookitHTTPResponse(f"/{index}", "GET") for index in range(3)]
+    (first, *_) = KookitHTTPService.create_response_groups(actions)
+    copy = dill.loads(dill.dumps(first))  # noqa: S301
+
+    groups = KookitHTTPService.create_response_groups(
+        [*actions, *(KookitHTTPResponse("/new", "GET") for _ in range(10))], states=first.states
+    )
+    assert len(first.states) >= 13
+    assert all(group.active for group in groups)
+    # a group keeps its state, also for the copies from before the states have grown
+    copy.deactivate()
+    assert [index for index, group in enumerate(groups) if not group.active] == [0]
+
+
+def test_group_states_of_running_server(kookit: Kookit) -> None:
+    service: Any = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/states")])
+    (group,) = service.response_groups
+
+    with kookit:
+        assert kookit.get(service, "/states").status_code == 200
+    # consumed by the server, seen by the test with no report back
+    assert not group.active
+
+
+def test_group_claims() -> None:
+    (group,) = KookitHTTPService.create_response_groups([KookitHTTPResponse("/claim", "GET")])
+
+    assert group.claim()
+    assert not group.claim()
+    assert (group.active, group.available) == (True, False)
+
+    group.release()
+    assert group.claim()
+    group.deactivate()
+    assert not group.active
+    assert not group.claim()
@@ -0,0 +1,96 @@
+import os
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+import pytest
+
+from kookit import Kookit, KookitASGIServer, KookitJSONRequest, KookitJSONResponse
+
+
+def test_in_process_service_response(
+    random_method: str,
+    random_status_code: int,
+    random_resp_json: dict,
+    random_headers: dict,
+    random_uri_path: str,
+    faker: Any,
+    kookit: Kookit,
+) -> None:
+    env_var: str = faker.pystr().upper()
+    service = kookit.new_http_service(
+        env_var,
+        actions=[
+            KookitJSONResponse(
+                random_resp_json,
+                url=random_uri_path,
+                method=random_method,
+                status_code=random_status_code,
+                headers=random_headers,
+            ),
+        ],
+        in_process=True,
+    )
+
+    assert os.environ[env_var] == service.url
+
+    with kookit, httpx.Client(base_url=os.environ[env_var]) as client:
+        response = client.request(random_method, random_uri_path)
+
+    assert response.status_code == random_status_code
+    assert dict(response.headers).items() >= random_headers.items()
+    assert response.json() == random_resp_json
+
+
+async def test_in_process_async_client(
+    random_uri_path: str,
+    random_resp_json: dict,
+    mocker: Any,
+) -> None:
+    kookit = Kookit(mocker, in_process=True)
+    service = kookit.new_http_service(
+        actions=[KookitJSONResponse(random_resp_json, url=random_uri_path)],
+    )
+    assert isinstance(kookit.http_kookit.server, KookitASGIServer)
+
+    async with kookit, httpx.AsyncClient(base_url=service.url) as client:
+        response = await client.get(random_uri_path)
+    kookit.close()
+
+    assert response.json() == random_resp_json
+
+
+def test_in_process_follow_up_request(
+    random_uri_path: str,
+    mocker: Any,
+) -> None:
+    kookit = Kookit(mocker, in_process=True)
+    callee = kookit.new_http_service(
+        actions=[KookitJSONResponse({}, url="/callback", method="POST", request_json={"a": 1})],
+    )
+    caller = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url=random_uri_path),
+            KookitJSONRequest(callee, url="/callback", json={"a": 1}),
+        ],
+    )
+
+    with kookit:
+        assert kookit.get(caller, random_uri_path).status_code == 200
+        kookit.sleep(0.3)
+    kookit.close()
+
+
+def test_in_process_lifespan_error(kookit: Kookit) -> None:
+    service = kookit.new_http_service(in_process=True)
+
+    @asynccontextmanager
+    async def lifespan(_app: Any) -> Any:
+        msg = "some error"
+        raise ValueError(msg)
+        yield
+
+    service.add_lifespans(lifespan)
+
+    with pytest.raises(RuntimeError), kookit:
+        pass
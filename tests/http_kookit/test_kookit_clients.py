@@ -0,0 +1,41 @@
+from typing import Any
+
+from kookit import Kookit, KookitJSONResponse
+
+
+def test_client_reused_within_context(
+    random_uri_path: str,
+    kookit: Kookit,
+) -> None:
+    service = kookit.new_http_service(
+        actions=[KookitJSONResponse({"i": i}, url=random_uri_path) for i in range(3)],
+    )
+
+    with kookit:
+        client = kookit.client(service)
+        for i in range(3):
+            assert kookit.get(service, random_uri_path).json() == {"i": i}
+            assert kookit.client(service) is client
+
+    assert not kookit.clients
+
+
+async def test_async_client(
+    random_method: str,
+    random_uri_path: str,
+    random_resp_json: dict,
+    kookit: Kookit,
+) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse(random_resp_json, url=random_uri_path, method=random_method),
+            KookitJSONResponse(random_resp_json, url=random_uri_path),
+        ],
+    )
+
+    async with kookit:
+        method: Any = getattr(kookit, f"a{random_method.lower()}")
+        assert (await method(service, random_uri_path)).json() == random_resp_json
+        assert (await kookit.arequest(service, "GET", random_uri_path)).json() == random_resp_json
+
+    assert not kookit.async_clients
@@ -0,0 +1,73 @@
+from typing import Any
+
+import pytest
+from fastapi import APIRouter
+
+from kookit import Kookit, KookitJSONRequest, KookitJSONResponse
+
+
+@pytest.mark.parametrize(
+    ("unique_url", "in_process"),
+    [(False, False), (True, False), (False, True)],
+)
+def test_live_actions(kookit: Kookit, unique_url: bool, in_process: bool) -> None:
+    service: Any = kookit.new_http_service(
+        unique_url=unique_url,
+        actions=[KookitJSONResponse({"phase": 1}, url="/phase")],
+        in_process=in_process,
+    )
+
+    router = APIRouter()
+
+    @router.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    with kookit:
+        assert kookit.get(service, "/phase").json() == {"phase": 1}
+
+        service.add_actions(KookitJSONResponse({"phase": 2}, url="/phase"))
+        service.add_routers(router)
+        assert kookit.get(service, "/phase").json() == {"phase": 2}
+        assert kookit.get(service, "/health").json() == {"status": "ok"}
+        assert kookit.get(service, "/phase").status_code == 400
+
+        service.add_actions(KookitJSONResponse({}, url="/unused"))
+        service.reset_actions()
+        assert kookit.get(service, "/unused").status_code == 404
+
+        service.add_actions(KookitJSONResponse({"phase": 3}, url="/phase"))
+        assert kookit.get(service, "/phase").json() == {"phase": 3}
+
+    assert service.metrics.matched == 3
+
+
+def test_live_actions_left_unused(kookit: Kookit) -> None:
+    service = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/used")])
+
+    kookit.__enter__()
+    assert kookit.get(service, "/used").status_code == 200
+    service.add_actions(KookitJSONResponse({}, url="/unused"))
+
+    with pytest.raises(RuntimeError, match="active groups left"):
+        kookit.__exit__(None, None, None)
+
+
+def test_live_actions_during_follow_ups(kookit: Kookit) -> None:
+    callee = kookit.new_http_service(
+        actions=[KookitJSONResponse({}, url="/callee", method="POST")]
+    )
+    service = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url="/a", method="GET"),
+            KookitJSONRequest(callee, url="/callee", json={}, request_delay=0.5),
+        ]
+    )
+
+    with kookit:
+        assert kookit.get(service, "/a").status_code == 200
+        # the group of /a is still running its follow-up request
+        service.add_actions(KookitJSONResponse({}, url="/b", method="GET"))
+        assert kookit.get(service, "/b").status_code == 200
+        kookit.sleep(1.0)
+    # no group is left claimed: the follow-up has deactivated /a in the states of the service
@@ -0,0 +1,31 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+
+from kookit import Kookit, KookitJSONResponse
+
+
+@asynccontextmanager
+async def slow_lifespan(_app: Any) -> Any:
+    await asyncio.sleep(1.0)
+    yield
+
+
+def test_unique_services_start_in_parallel(kookit: Kookit) -> None:
+    services = [
+        kookit.new_http_service(
+            unique_url=True,
+            actions=[KookitJSONResponse({"index": index}, url="/index")],
+            lifespans=[slow_lifespan],
+        )
+        for index in range(6)
+    ]
+
+    started_at: float = time.perf_counter()
+    with kookit(10.0):
+        startup_duration: float = time.perf_counter() - started_at
+        responses = [kookit.get(service, "/index") for service in services]
+
+    assert [response.json() for response in responses] == [{"index": i} for i in range(6)]
+    assert startup_duration < 4.0
@@ -0,0 +1,62 @@
+import gc
+import socket
+from typing import Any
+
+import httpx
+import pytest
+from multiprocess.shared_memory import SharedMemory
+
+from kookit import Kookit, KookitJSONResponse
+
+
+def test_ports_reserved(kookit: Kookit) -> None:
+    services = [kookit.new_http_service(unique_url=True) for _ in range(20)]
+    ports = {httpx.URL(service.url).port for service in services}
+    assert len(ports) == len(services)
+
+    with socket.socket() as sock, pytest.raises(OSError, match="in use"):
+        sock.bind(("127.0.0.1", ports.pop()))
+
+
+def test_same_url_between_contexts(
+    random_uri_path: str,
+    mocker: Any,
+) -> None:
+    kookit = Kookit(mocker)
+    service = kookit.new_http_service(unique_url=True)
+    for i in range(2):
+        service.add_actions(KookitJSONResponse({"i": i}, url=random_uri_path))
+        with kookit:
+            assert kookit.get(service, random_uri_path).json() == {"i": i}
+
+    with pytest.raises(httpx.ConnectError):
+        httpx.get(f"{service.url}{random_uri_path}", timeout=1)
+    kookit.close()
+
+
+def test_ports_released(mocker: Any) -> None:
+    kookit = Kookit(mocker)
+    service = kookit.new_http_service(unique_url=True)
+    kookit.close()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", httpx.URL(service.url).port))
+
+
+@pytest.mark.filterwarnings("error")
+def test_released_without_close(mocker: Any) -> None:
+    kookit = Kookit(mocker)
+    service: Any = kookit.new_http_service(unique_url=True)
+    url: str = service.url
+    spec = service.spec()
+    memory = [spec.journal.memory.name, *(memory.name for memory, *_ in spec.metrics.blocks)]
+    with kookit:
+        pass
+
+    del kookit, service, spec
+    gc.collect()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", httpx.URL(url).port))
+    for name in memory:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
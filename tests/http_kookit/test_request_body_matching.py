@@ -0,0 +1,71 @@
+from typing import Iterator
+
+import pytest
+
+from kookit import Kookit, KookitHTTPResponse
+from kookit.http_kookit.body import BodyMatch
+from kookit.http_kookit.service import KookitHTTPService
+
+
+def upload(blob: bytes, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    for start in range(0, len(blob), chunk_size):
+        yield blob[start : start + chunk_size]
+
+
+def test_body_match_rejects_early() -> None:
+    groups = KookitHTTPService.create_response_groups(
+        [
+            KookitHTTPResponse("/upload", "POST", request_content=b"a" * 10),
+            KookitHTTPResponse("/upload", "POST", request_content=b"b" * 20),
+        ]
+    )
+
+    assert list(BodyMatch(groups, 20).candidates) == [groups[1]]
+
+    match = BodyMatch(groups)
+    match.feed(b"b" * 15)
+    assert match.candidates == [groups[1]]
+    match.feed(b"b" * 10)
+    assert match.decided
+    assert match.result() is None
+
+    (anything,) = KookitHTTPService.create_response_groups([KookitHTTPResponse("/upload", "POST")])
+    match = BodyMatch([*groups, anything])
+    match.feed(b"a" * 21)
+    assert match.decided
+    assert match.result() is anything
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_request_body_matching(kookit: Kookit, in_process: bool) -> None:
+    blob: bytes = bytes(range(256)) * 8 * 1024
+    other: bytes = blob[:-1] + b"!"
+    service = kookit.new_http_service(
+        actions=[
+            KookitHTTPResponse("/upload", "POST", text="other", request_content=other),
+            KookitHTTPResponse("/upload", "POST", text="blob", request_content=blob),
+            KookitHTTPResponse("/upload", "POST", text="any"),
+        ],
+        in_process=in_process,
+    )
+
+    with kookit:
+        assert kookit.post(service, "/upload", content=upload(blob)).text == "blob"
+        assert kookit.post(service, "/upload", content=blob[:100]).text == "any"
+        assert kookit.post(service, "/upload", content=other).text == "other"
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_request_body_mismatch(kookit: Kookit, streamed: bool) -> None:
+    blob: bytes = b"x" * 1024 * 1024
+    service = kookit.new_http_service(
+        actions=[KookitHTTPResponse("/upload", "POST", request_content=blob)],
+    )
+
+    content: bytes = blob[:-1] + b"y"
+    with pytest.raises(RuntimeError), kookit:
+        response = kookit.post(
+            service, "/upload", content=upload(content) if streamed else content
+        )
+
+    assert response.status_code == 400
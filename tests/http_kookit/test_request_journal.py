@@ -0,0 +1,101 @@
+import pytest
+from fastapi import APIRouter, Request
+
+from kookit import Kookit, KookitHTTPResponse, KookitJSONResponse
+from kookit.http_kookit.journal import RequestJournal
+
+
+def test_request_journal(kookit: Kookit) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url="/items/{item_id}", method="POST"),
+            KookitJSONResponse({}, url="/items/{item_id}", method="POST"),
+        ]
+    )
+
+    with kookit:
+        kookit.post(service, "/items/1?full=true", content=b"first", headers={"x-id": "1"})
+        kookit.post(service, "/items/2", content=b"second")
+        kookit.post(service, "/items/3")
+
+    first, second, other = service.calls()
+    assert (first.method, first.target, first.path) == ("POST", "/items/1?full=true", "/items/1")
+    assert (first.body, first.body_length, first.route) == (
+        b"first",
+        5,
+        ("POST", "/items/{item_id}"),
+    )
+    assert ("x-id", "1") in first.headers
+    assert first.received_at <= second.received_at
+    assert first.duration > 0
+    assert other.route is None
+
+    # filtered by the path or by the route it matched
+    assert service.calls("POST", "/items/{item_id}") == [first, second]
+    assert service.calls(path="/items/2") == [second]
+    assert service.calls(path="/items/3") == [other]
+    assert service.calls("PUT") == []
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_request_journal_of_all_routes(kookit: Kookit, in_process: bool) -> None:
+    router = APIRouter()
+
+    @router.post("/users/{user_id}")
+    async def user(request: Request) -> dict:
+        return {"length": len(await request.body())}
+
+    service = kookit.new_http_service(
+        actions=[KookitJSONResponse({}, url="/items")],
+        routers=[router],
+        in_process=in_process,
+    )
+    other = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/others")])
+
+    with kookit:
+        assert kookit.post(service, "/users/1", content=b"user").json() == {"length": 4}
+        assert kookit.get(service, "/items").status_code == 200
+        assert kookit.get(service, "/missing").status_code == 404
+        assert kookit.get(other, "/others").status_code == 200
+
+    user_call, item_call, missing_call = service.calls()
+    assert (user_call.route, user_call.body) == (("POST", "/users/{user_id}"), b"user")
+    assert item_call.route == ("GET", "/items")
+    assert (missing_call.path, missing_call.route) == ("/missing", None)
+    assert all(call.duration > 0 for call in service.calls())
+    # the services of a server share the requests routed to none of them
+    assert [call.path for call in other.calls()] == (
+        ["/others"] if in_process else ["/missing", "/others"]
+    )
+
+
+def test_request_journal_of_workers(kookit: Kookit) -> None:
+    service = kookit.new_http_service(
+        actions=[KookitHTTPResponse("/worker", "GET") for _ in range(10)],
+        workers=2,
+    )
+
+    with kookit:
+        for _ in range(10):
+            kookit.get(service, "/worker")
+
+    assert len(service.calls("GET", "/worker")) == 10
+
+
+def test_request_journal_bounded() -> None:
+    journal = RequestJournal(4, slot_size=128)
+    scope: dict = {
+        "method": "POST",
+        "path": "/bounded",
+        "headers": [(b"content-type", b"text/plain")],
+    }
+    for index in range(10):
+        journal.append(scope, b"x" * 100, 100, None, received_at=index, duration=0.0)
+
+    # the oldest calls are overwritten, what doesn't fit into a slot is cut
+    assert len(journal) == 10
+    calls = journal.calls()
+    assert [call.received_at for call in calls] == [6, 7, 8, 9]
+    assert calls[0].body == b"x" * 38
+    assert calls[0].body_length == 100
+    journal.close()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Iterator
+
+import pytest
+from fastapi import APIRouter
+
+from kookit import Kookit, KookitHTTPServerPool, KookitJSONResponse
+
+
+@pytest.fixture(scope="module")
+def pool() -> Iterator[KookitHTTPServerPool]:
+    pool = KookitHTTPServerPool()
+    yield pool
+    pool.close()
+
+
+@pytest.mark.parametrize("unique_url", [False, True])
+def test_server_reused_across_leases(
+    pool: KookitHTTPServerPool,
+    mocker: Any,
+    random_uri_path: str,
+    unique_url: bool,
+) -> None:
+    urls: set[str] = set()
+    for i in range(3):
+        kookit = Kookit(mocker, pool)
+        service = kookit.new_http_service(
+            unique_url=unique_url,
+            actions=[KookitJSONResponse({"lease": i}, url=random_uri_path)],
+        )
+        with kookit:
+            assert kookit.get(service, random_uri_path).json() == {"lease": i}
+        kookit.close()
+        urls.add(service.url)
+
+    assert len(pool.servers) == 1 + int(unique_url)
+    assert urls <= {server.url for server in pool.servers}
+
+
+def test_lease_lifespans_entered_and_exited(
+    pool: KookitHTTPServerPool,
+    mocker: Any,
+) -> None:
+    kookit = Kookit(mocker, pool)
+    service = kookit.new_http_service()
+
+    @asynccontextmanager
+    async def lifespan(app: Any) -> Any:
+        app.state.phase = "started"
+        service.add_actions(KookitJSONResponse({"phase": app.state.phase}, url="/phase"))
+        yield
+
+    service.add_lifespans(lifespan)
+
+    with kookit:
+        assert kookit.get(service, "/phase").json() == {"phase": "started"}
+    kookit.close()
+
+    kookit = Kookit(mocker, pool)
+    service = kookit.new_http_service()
+    with kookit:
+        assert kookit.get(service, "/phase").status_code == 404
+    kookit.close()
+
+
+def test_unused_responses_reported_from_lease(
+    pool: KookitHTTPServerPool,
+    mocker: Any,
+    random_uri_path: str,
+) -> None:
+    kookit = Kookit(mocker, pool)
+    kookit.new_http_service(actions=[KookitJSONResponse({}, url=random_uri_path)])
+
+    with pytest.raises(RuntimeError, match="active groups left"), kookit:
+        pass
+    kookit.close()
+
+
+def test_servers_started_with_pool_environment(mocker: Any) -> None:
+    router = APIRouter()
+
+    @router.get("/environ")
+    async def environ() -> dict:
+        return {"patched": os.environ.get("KOOKIT_PATCHED")}
+
+    # a server started ahead of the test and one started within it
+    pool = KookitHTTPServerPool()
+    pool.start()
+    kookit = Kookit(mocker, pool)
+    kookit.patch_env({"KOOKIT_PATCHED": "1"})
+    services = [
+        kookit.new_http_service(routers=[router], unique_url=unique_url)
+        for unique_url in (False, True)
+    ]
+    with kookit:
+        assert [kookit.get(service, "/environ").json() for service in services] == [
+            {"patched": None},
+            {"patched": None},
+        ]
+    kookit.close()
+    assert len(pool.servers) == 2
+    pool.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from kookit import Kookit, KookitJSONResponse
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_service_metrics(kookit: Kookit, in_process: bool) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitJSONResponse({}, url="/items/{item_id}"),
+            KookitJSONResponse({}, url="/items/{item_id}"),
+            KookitJSONResponse({}, url="/items", method="POST"),
+        ],
+        in_process=in_process,
+    )
+
+    with kookit:
+        assert kookit.get(service, "/items/1").status_code == 200
+        assert kookit.get(service, "/items/2").status_code == 200
+        assert kookit.post(service, "/items").status_code == 200
+        assert kookit.post(service, "/items").status_code == 400
+
+        metrics = service.metrics
+        assert (metrics.received, metrics.matched, metrics.unmatched) == (4, 3, 1)
+        assert 0 < metrics.matching_seconds < metrics.serving_seconds
+        assert sum(metrics.histogram("GET", "/items/{item_id}").values()) == 2
+        assert sum(metrics.histogram("POST", "/items").values()) == 1
+        assert set(metrics.snapshot()["routes"]) == {"GET /items/{item_id}", "POST /items"}
+
+
+def test_service_metrics_grown(kookit: Kookit) -> None:
+    service = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/0")])
+    metrics = service.metrics
+
+    with kookit:
+        assert kookit.get(service, "/0").status_code == 200
+        for index in range(1, 10):
+            service.add_actions(KookitJSONResponse({}, url=f"/{index}"))
+            assert kookit.get(service, f"/{index}").status_code == 200
+
+    # grown in place, by blocks twice as large
+    assert service.metrics is metrics
+    assert [room for *_, room in metrics.blocks] == [0, 1, 1, 2, 4, 8]
+    assert (metrics.received, metrics.matched) == (10, 10)
+    assert all(sum(metrics.histogram("GET", f"/{index}").values()) == 1 for index in range(10))
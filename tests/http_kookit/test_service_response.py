@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Any
 import pytest
 import requests  # type: ignore[import-untyped]
 
-from kookit import Kookit, KookitJSONResponse
+from kookit import Kookit, KookitHTTPResponse, KookitJSONResponse
 
 
 if TYPE_CHECKING:
@@ -60,3 +60,23 @@ def test_service_json_response(
     assert response.status_code == random_status_code
     assert dict(response.headers).items() >= headers.items()
     assert response.json() == resp_json
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_service_raw_response(kookit: Kookit, in_process: bool) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitHTTPResponse("/raw", "GET", content=b"raw", headers={"X-Raw": "1"}),
+            KookitJSONResponse({"raw": False}, url="/json", status_code=201),
+        ],
+        in_process=in_process,
+    )
+
+    with kookit:
+        raw: Response = kookit.get(service, "/raw")
+        json: Response = kookit.get(service, "/json")
+
+    assert (raw.status_code, raw.content, raw.headers["x-raw"]) == (200, b"raw", "1")
+    assert raw.headers.get_list("content-length") == ["3"]
+    assert (json.status_code, json.json()) == (201, {"raw": False})
+    assert json.headers["content-type"] == "application/json"
@@ -0,0 +1,75 @@
+import gc
+from typing import Any
+
+import dill
+import pytest
+from fastapi import APIRouter
+
+from kookit import Kookit, KookitHTTPResponse, KookitJSONRequest, KookitJSONResponse
+from kookit.http_kookit.spec import ServiceSpec
+
+
+router = APIRouter()
+
+
+@router.get("/router")
+async def read_router() -> dict:
+    return {"router": True}
+
+
+@router.get("/frozen")
+async def read_frozen() -> int:
+    return gc.get_freeze_count()
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn", "forkserver"])
+def test_start_methods(mocker: Any, start_method: str) -> None:
+    kookit = Kookit(mocker, start_method=start_method)
+    callee = kookit.new_http_service(
+        actions=[KookitJSONResponse({}, url="/callee", method="POST")]
+    )
+    service = kookit.new_http_service(
+        actions=[
+            KookitHTTPResponse("/upload", "POST", text="uploaded", request_content=b"body"),
+            KookitJSONRequest(callee, url="/callee", method="POST", json={}),
+        ],
+        routers=[router],
+        unique_url=True,
+    )
+
+    with kookit(10.0):
+        assert kookit.get(service, "/router").json() == {"router": True}
+        assert kookit.post(service, "/upload", content=b"other").status_code == 400
+        assert kookit.post(service, "/upload", content=b"body").text == "uploaded"
+        kookit.sleep(0.5)
+        assert (service.metrics.matched, service.metrics.unmatched) == (1, 1)
+    kookit.close()
+
+
+def test_zygote(mocker: Any) -> None:
+    kookit = Kookit(mocker, start_method="forkserver")
+    service = kookit.new_http_service(routers=[router], unique_url=True)
+
+    with kookit(10.0):
+        # forked from the zygote with the server stack frozen in its heap
+        assert kookit.get(service, "/frozen").json() > 0
+    kookit.close()
+
+
+def test_spec_version(kookit: Kookit) -> None:
+    service = kookit.new_http_service(actions=[KookitJSONResponse({}, url="/spec")])
+    spec: ServiceSpec = service.spec()  # type: ignore[attr-defined]
+
+    copy = dill.loads(dill.dumps(spec))  # noqa: S301
+    assert (copy.key, len(copy.response_groups)) == (spec.key, 1)
+    copy.metrics.close()
+    copy.journal.close()
+    assert "KookitHTTPService" not in str(dill.dumps(spec))
+    # groups are compiled for the server, the response models stay here
+    assert "KookitJSONResponse" not in str(dill.dumps(spec))
+    assert copy.response_groups[0].response is None
+
+    state: dict = spec.__getstate__()
+    with pytest.raises(ValueError, match="version"):
+        ServiceSpec.__new__(ServiceSpec).__setstate__({**state, "version": 0})
+    service.reset_actions()
@@ -0,0 +1,41 @@
+import time
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from kookit import Kookit, KookitStreamingResponse
+
+
+def chunks() -> Iterator[bytes]:
+    for _ in range(10):
+        yield b"x" * 1000
+
+
+async def async_chunks() -> AsyncIterator[bytes]:
+    for index in range(4):
+        yield str(index).encode()
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_streaming_response(kookit: Kookit, in_process: bool) -> None:
+    service = kookit.new_http_service(
+        actions=[
+            KookitStreamingResponse(chunks, url="/download", chunk_size=4096),
+            KookitStreamingResponse(async_chunks, url="/download", chunk_delay=0.05),
+            KookitStreamingResponse(chunks, url="/download", bytes_per_second=20_000),
+        ],
+        in_process=in_process,
+    )
+
+    with kookit:
+        response = kookit.get(service, "/download")
+        assert response.content == b"x" * 10_000
+        assert in_process or response.headers["transfer-encoding"] == "chunked"
+
+        started_at: float = time.perf_counter()
+        assert kookit.get(service, "/download").content == b"0123"
+        assert time.perf_counter() - started_at >= 0.15
+
+        started_at = time.perf_counter()
+        assert len(kookit.get(service, "/download").content) == 10_000
+        assert time.perf_counter() - started_at >= 0.45
@@ -0,0 +1,37 @@
+import os
+
+import httpx
+import pytest
+from fastapi import APIRouter
+
+from kookit import Kookit, KookitHTTPResponse
+
+
+def test_workers(kookit: Kookit) -> None:
+    router = APIRouter()
+
+    @router.get("/pid")
+    def pid() -> int:
+        return os.getpid()
+
+    service = kookit.new_http_service(
+        actions=[KookitHTTPResponse("/once", "GET", text=str(index)) for index in range(10)],
+        routers=[router],
+        workers=2,
+    )
+
+    with kookit:
+        # every request comes on a new connection, so the kernel spreads them over the workers
+        pids: set = {httpx.get(f"{service.url}/pid").json() for _ in range(40)}
+        assert len(pids) == 2
+        assert os.getpid() not in pids
+
+        # a response consumed by a worker is never served by another one
+        texts: list = [httpx.get(f"{service.url}/once").text for _ in range(10)]
+        assert texts == [str(index) for index in range(10)]
+        assert (service.metrics.received, service.metrics.matched) == (10, 10)
+
+
+def test_in_process_workers(kookit: Kookit) -> None:
+    with pytest.raises(ValueError, match="single worker"):
+        kookit.new_http_service(in_process=True, workers=2)
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from kookit.logging import KookitLogger
+
+
+class Formatted:
+    def __init__(self) -> None:
+        self.count: int = 0
+
+    def __format__(self, spec: str) -> str:
+        self.count += 1
+        return "formatted"
+
+
+def test_records_below_level_not_formatted() -> None:
+    logger = KookitLogger("DEBUG")
+    argument = Formatted()
+
+    logger.trace("{}", argument)
+    assert argument.count == 0
+    assert logger.enabled("DEBUG")
+    assert not logger.enabled("TRACE")
+
+
+def test_ring_buffer() -> None:
+    logger = KookitLogger("ERROR", buffer=3)
+    argument = Formatted()
+
+    for index in range(5):
+        logger.trace("{} {}", argument, index)
+    # buffered records are formatted once drained
+    assert argument.count == 0
+
+    lines: list = logger.drain()
+    assert [line.split(" | ")[1:] for line in lines] == [
+        ["TRACE   ", f"formatted {index}"] for index in range(2, 5)
+    ]
+    assert (argument.count, logger.drain()) == (3, [])
+
+
+def test_log_of_failed_test(tmp_path: Path) -> None:
+    (tmp_path / "test_failed.py").write_text(
+        "from kookit import KookitJSONResponse\n"
+        "def test_failed(kookit):\n"
+        "    service = kookit.new_http_service(actions=[KookitJSONResponse({}, url='/')])\n"
+        "    with kookit:\n"
+        "        kookit.get(service, '/')\n"
+        "    assert False\n"
+        "def test_passed(kookit):\n"
+        "    kookit.new_http_service()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--kookit-log-buffer", "1000", "-p", "no:cacheprovider"],  # noqa: S603
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.stdout.count("kookit log") == 1
+    # records of the server process are there as well
+    assert "running uvicorn" in result.stdout
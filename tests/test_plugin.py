@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import kookit
+from kookit.kookit import Kookit
+
+
+def test_plugin_imports_nothing_heavy() -> None:
+    code = (
+        "import sys, kookit; "
+        "print(','.join(m for m in ('fastapi', 'httpx', 'multiprocess', 'uvicorn', 'pytest_mock')"
+        " if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],  # noqa: S603
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_names() -> None:
+    assert kookit.Kookit is Kookit
+    assert "kookit_server_pool" in vars(kookit)